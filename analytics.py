@@ -0,0 +1,87 @@
+import numpy as np
+
+# Share of attempts in each of the top and bottom groups for the discrimination index
+DISCRIMINATION_GROUP = 0.27
+
+
+def load_answers(rows):
+    # rows yields (packed question ids, packed answers) pairs as stored on Score;
+    # returns flat question id and answer arrays plus the attempt each answer belongs to
+    id_chunks = []
+    answer_chunks = []
+    lengths = []
+    for packed_question_ids, packed_answers in rows:
+        id_chunks.append(packed_question_ids)
+        answer_chunks.append(packed_answers)
+        lengths.append(len(packed_answers))
+    question_ids = np.frombuffer(b''.join(id_chunks), dtype=np.uint32)
+    answers = np.frombuffer(b''.join(answer_chunks), dtype=np.int8)
+    attempts = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+    return question_ids, answers, attempts
+
+
+def grade_batch(positions, answers, answer_key):
+    # positions index into answer_key; a -1 position is a question no longer in the bank
+    known = positions >= 0
+    correct = np.zeros(len(answers), dtype=bool)
+    correct[known] = answers[known] == answer_key[positions[known]]
+    return correct
+
+
+def analyze(question_bank, question_ids, answers, attempts, option_count=None):
+    if option_count is None:
+        # Wide enough for the question with the most options, so no pick is folded into another
+        option_count = max((len(question.options) for question in question_bank.questions), default=0)
+    bank_ids = np.array([question.id for question in question_bank.questions], dtype=np.int64)
+    answer_key = np.array([question.answer for question in question_bank.questions], dtype=np.int8)
+    order = np.argsort(bank_ids)
+    sorted_ids = bank_ids[order]
+    lookup = np.minimum(np.searchsorted(sorted_ids, question_ids), len(sorted_ids) - 1)
+    found = sorted_ids[lookup] == question_ids
+    positions = np.where(found, order[lookup], -1)
+
+    correct = grade_batch(positions, answers, answer_key)
+    attempt_count = int(attempts.max()) + 1 if len(attempts) else 0
+    scores = np.bincount(attempts, weights=correct, minlength=attempt_count)
+
+    positions, answers, attempts, correct = positions[found], answers[found], attempts[found], correct[found]
+    question_count = len(bank_ids)
+    asked = np.bincount(positions, minlength=question_count)
+    right = np.bincount(positions, weights=correct, minlength=question_count)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        difficulty = right / asked
+
+    # Discrimination: share correct among the top scorers minus among the bottom scorers
+    discrimination = np.full(question_count, np.nan)
+    if attempt_count:
+        ranked = np.argsort(scores, kind='stable')
+        group = max(1, int(attempt_count * DISCRIMINATION_GROUP))
+        in_lower = np.zeros(attempt_count, dtype=bool)
+        in_upper = np.zeros(attempt_count, dtype=bool)
+        in_lower[ranked[:group]] = True
+        in_upper[ranked[-group:]] = True
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = []
+            for members in (in_upper, in_lower):
+                selected = members[attempts]
+                asked_in_group = np.bincount(positions[selected], minlength=question_count)
+                right_in_group = np.bincount(positions[selected], weights=correct[selected], minlength=question_count)
+                rates.append(right_in_group / asked_in_group)
+        discrimination = rates[0] - rates[1]
+
+    # Column 0 counts unanswered questions, column i + 1 counts option i
+    clipped = np.clip(answers.astype(np.int64), -1, option_count - 1) + 1
+    distribution = np.bincount(positions * (option_count + 1) + clipped,
+                               minlength=question_count * (option_count + 1)).reshape(question_count, option_count + 1)
+
+    report = []
+    for position, question in enumerate(question_bank.questions):
+        report.append({
+            'question': question,
+            'asked': int(asked[position]),
+            'difficulty': None if np.isnan(difficulty[position]) else float(difficulty[position]),
+            'discrimination': None if np.isnan(discrimination[position]) else float(discrimination[position]),
+            'unanswered': int(distribution[position, 0]),
+            'options': distribution[position, 1:len(question.options) + 1].tolist(),
+        })
+    return {'attempts': attempt_count, 'answers': int(len(answers)), 'questions': report}
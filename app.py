@@ -1,365 +1,640 @@
-from flask import Flask, render_template, redirect, url_for, request, flash, session
+from flask import Flask, render_template, redirect, url_for, request, flash, session, abort, jsonify
 from flask_sqlalchemy import SQLAlchemy
-from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
+from sqlalchemy import case, func, or_
+from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user, login_url
 from werkzeug.security import generate_password_hash, check_password_hash
-import random
+from datetime import datetime, timedelta, timezone
+from array import array
+from functools import lru_cache
+import hashlib
+from uuid import uuid4
+import atexit
+import threading
+from markupsafe import Markup
+from question_bank import QuestionBankLoader
+from fragments import FragmentCache
+from leaderboard import Leaderboard
+from selection import Selector
+from ttl_cache import TTLCache
+from database import create_missing, database_url, engine_options, install_sqlite_pragmas, upsert
+from score_writer import ScoreWriter, claim_journal
+from deadlines import DeadlineScheduler
+from rate_limit import MemoryRateLimiter, SQLiteRateLimiter
+import metrics
+from compression import init_compression
+from grading import UNANSWERED, grade, pack_answers, read_answer
+import os
 
 app = Flask(__name__)
-app.config['SECRET_KEY'] = 'your_secret_key'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///quiz.db'
+app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your_secret_key')
+# DATABASE_URL may point at SQLite or a server database such as PostgreSQL;
+# pool sizes and timeouts come from DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT and DB_POOL_RECYCLE
+app.config['SQLALCHEMY_DATABASE_URI'] = database_url(os.environ.get('DATABASE_URL', 'sqlite:///quiz.db'))
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'], os.environ)
+# WAL lets readers carry on while a quiz submission holds the write lock
+app.config['SQLITE_PRAGMAS'] = {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 30000}
+app.config['QUIZ_ATTEMPT_TTL'] = timedelta(hours=2)  # Unsubmitted attempts are purged after this; keep above the time limit
+# Timed attempts are graded from their autosaved answers once the deadline passes; None disables the timer
+app.config['QUIZ_TIME_LIMIT'] = timedelta(minutes=30)
+app.config['QUIZ_DEADLINE_GRACE'] = timedelta(seconds=10)  # Allowance for a final submission still in flight
+app.config['QUIZ_AUTOSAVE_INTERVAL'] = 5  # Seconds the quiz page collects answer changes before saving them
+app.config['QUIZ_LENGTH'] = 30
+app.config['QUIZ_STRATIFIED'] = False  # Draw evenly from each category; applies when QUIZ_ADAPTIVE is off
+# Adaptive selection favours unseen questions, weak categories and questions near the user's level
+app.config['QUIZ_ADAPTIVE'] = True
+app.config['QUIZ_HISTORY_MEMORY'] = 64 * 1024 * 1024  # Bytes of per-user answer history kept per worker
+app.config['QUIZ_HISTORY_ATTEMPTS'] = 100  # Most recent quizzes an evicted history is rebuilt from
+# Seconds a cached history is used before it is rebuilt from the database; quizzes graded by
+# other workers are missed by this worker's selection for at most this long
+app.config['QUIZ_HISTORY_MAX_AGE'] = 30
+app.config['QUESTION_BANK_PATH'] = os.path.join(app.root_path, 'questions.jsonl')
+app.config['QUESTION_BANK_RELOAD_INTERVAL'] = 5  # Seconds between checks for an updated bank file
+app.config['QUIZ_FRAGMENT_CACHE_SIZE'] = 4 * 1024 * 1024  # Characters of rendered question HTML to keep
+app.config['RESULTS_PAGE_SIZE'] = 20
+app.config['RESULTS_TREND_WINDOW'] = 5  # Compare the last N scores with the N before them
+app.config['LEADERBOARD_SIZE'] = 10
+app.config['LEADERBOARD_REFRESH_INTERVAL'] = 60  # Seconds before other workers' scores show up
+app.config['USER_CACHE_TTL'] = 30  # Seconds a logged-in user is served without a query; 0 disables
+# Stored hashes made with other parameters are upgraded on the user's next login
+app.config['PASSWORD_HASH_METHOD'] = 'scrypt:32768:8:1'
+app.config['PASSWORD_SALT_LENGTH'] = 16
+# Token buckets checked before any password hashing: (burst, seconds to refill it), None disables.
+# Successful logins give their tokens back, so only failed logins and registrations use them up
+app.config['RATE_LIMIT_IP'] = (30, 300)  # Per client address; the burst covers a class registering behind one NAT
+app.config['RATE_LIMIT_ACCOUNT'] = (5, 300)  # Failed logins per account email
+app.config['RATE_LIMIT_MAX_KEYS'] = 100000  # Buckets kept in memory per limiter
+# A SQLite file shared by all workers, e.g. instance/ratelimit.db; buckets are per process when unset
+app.config['RATE_LIMIT_STORAGE'] = os.environ.get('RATE_LIMIT_STORAGE')
+# Write-behind mode: graded scores are journaled locally and committed in batches
+app.config['SCORE_WRITE_BEHIND'] = False
+app.config['SCORE_BATCH_SIZE'] = 200  # Most scores per transaction; this many waiting also starts a flush early
+app.config['SCORE_FLUSH_INTERVAL'] = 0.5  # Seconds a score may wait before its batch is written
+app.config['SCORE_MAX_PENDING'] = 10000  # Beyond this, submissions are written directly
+app.config['SCORE_JOURNAL_FSYNC'] = False  # Journal survives process crashes; fsync also covers power loss
+# Prometheus-format /metrics; no hooks are installed while disabled
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED') == '1'
+app.config['PROFILER_SAMPLE_RATE'] = 0.0  # Fraction of requests profiled with cProfile when metrics are enabled
+app.config['PROFILER_DIR'] = os.path.join(app.instance_path, 'profiles')
+# Users allowed to see the question analytics report
+app.config['ADMIN_EMAILS'] = {email.strip() for email in os.environ.get('ADMIN_EMAILS', '').split(',') if email.strip()}
+app.config['QUESTION_REPORT_TTL'] = 300  # Seconds the analytics report is reused before recomputing
+# JSON API under /api/v1: question content named by bank version is cached by clients
+app.config['API_MAX_QUESTIONS'] = 100  # Question ids accepted per /api/v1/questions request
+app.config['API_QUESTIONS_MAX_AGE'] = 365 * 24 * 3600
+# gzip responses (brotli when the module is installed) larger than COMPRESS_MIN_SIZE bytes
+app.config['COMPRESS_ENABLED'] = True
+app.config['COMPRESS_MIN_SIZE'] = 500
+app.config['COMPRESS_LEVEL'] = 6
 db = SQLAlchemy(app)
+with app.app_context():
+    install_sqlite_pragmas(db.engine, app.config['SQLITE_PRAGMAS'])
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 
+@login_manager.unauthorized_handler
+def unauthorized():
+    # API clients get a status they can act on instead of a redirect to the login form
+    if request.path.startswith('/api/'):
+        return api_error('authentication required', 401)
+    flash(login_manager.login_message, login_manager.login_message_category)
+    return redirect(login_url(login_manager.login_view, request.url))
+
+def api_error(message, status, **details):
+    return jsonify(error=message, **details), status
+
 # Database Models
 class User(UserMixin, db.Model):
     __tablename__ = "user"  # Explicitly setting table name
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128), nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)
     scores = db.relationship('Score', backref='user', lazy=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        with metrics.timer('password_hash'):
+            self.password_hash = generate_password_hash(password, method=app.config['PASSWORD_HASH_METHOD'],
+                                                        salt_length=app.config['PASSWORD_SALT_LENGTH'])
+        if self.id is not None:
+            user_cache.pop(self.id)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        with metrics.timer('password_check'):
+            return check_password_hash(self.password_hash, password)
+
+    def needs_rehash(self):
+        method, salt, _ = self.password_hash.split('$', 2)
+        return (method != password_hash_prefix(app.config['PASSWORD_HASH_METHOD'])
+                or len(salt) != app.config['PASSWORD_SALT_LENGTH'])
+
+@lru_cache(maxsize=None)
+def password_hash_prefix(method):
+    # werkzeug fills in default parameters, so hash once to learn the stored form
+    return generate_password_hash('', method=method).split('$', 1)[0]
 
 class Score(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     score = db.Column(db.Integer, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    submission_id = db.Column(db.String(32), unique=True, index=True)  # Lets a replayed journal skip committed scores
+    # Packed uint32 question ids and int8 chosen options (-1 unanswered), see grading.pack_answers
+    question_ids = db.Column(db.LargeBinary)
+    answers = db.Column(db.LargeBinary)
+    __table_args__ = (db.Index('ix_score_user_id_id', 'user_id', 'id'),)
+
+# Per-user summary kept in step with Score inserts; the empty category is the overall board
+class LeaderboardEntry(db.Model):
+    category = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    best_score = db.Column(db.Integer, nullable=False)
+    total_score = db.Column(db.Integer, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False)
+    user = db.relationship('User', lazy='joined')
+    __table_args__ = (db.Index('ix_leaderboard_rank', 'category', 'best_score', 'total_score', 'user_id'),)
+
+# In-progress quiz, kept server-side so the session cookie only carries its id
+class QuizAttempt(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    question_ids = db.Column(db.String(512), nullable=False)  # Comma-separated bank ids
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    deadline = db.Column(db.DateTime, index=True)  # None for untimed attempts
+    status = db.Column(db.String(16), default='open')  # 'graded' once a submission or the deadline claims it
+    answers = db.Column(db.LargeBinary)  # Autosaved int8 option indices in question order
+    __table_args__ = (db.Index('ix_quiz_attempt_user_id_id', 'user_id', 'id'),)
+
+    def get_question_ids(self):
+        return [int(question_id) for question_id in self.question_ids.split(',')]
+
+    def is_expired(self):
+        return self.created_at < datetime.utcnow() - app.config['QUIZ_ATTEMPT_TTL']
+
+    def is_overdue(self):
+        return self.deadline is not None and datetime.utcnow() > self.deadline + app.config['QUIZ_DEADLINE_GRACE']
+
+    def save_answers(self, form):
+        # Merge the answers present in form, keyed like the quiz form; an empty value clears one
+        question_ids = self.get_question_ids()
+        saved = array('b', self.answers) if self.answers else array('b', [UNANSWERED]) * len(question_ids)
+        for index, question_id in enumerate(question_ids):
+            value = form.get(str(question_id))
+            if value is not None:
+                saved[index] = read_answer(value, 128)
+        self.answers = saved.tobytes()
+
+    def get_saved_answers(self):
+        if not self.answers:
+            return {}
+        return {str(question_id): answer for question_id, answer in zip(self.get_question_ids(), array('b', self.answers))
+                if answer != UNANSWERED}
+
+# Detached User objects served to authenticated requests without a query
+user_cache = TTLCache(app.config['USER_CACHE_TTL'])
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
-
-# Quiz Questions (300 Questions)
-
-quiz_questions = {
-    # General Knowledge (50 Questions)
-    1: {'question': 'What is the capital of France?', 'options': ['Paris', 'London', 'Berlin', 'Madrid'], 'correct': 'Paris'},
-    2: {'question': 'Who wrote "Romeo and Juliet"?', 'options': ['William Shakespeare', 'Charles Dickens', 'Mark Twain', 'Jane Austen'], 'correct': 'William Shakespeare'},
-    3: {'question': 'Which planet is known as the Red Planet?', 'options': ['Earth', 'Mars', 'Jupiter', 'Saturn'], 'correct': 'Mars'},
-    4: {'question': 'What is the largest ocean on Earth?', 'options': ['Atlantic Ocean', 'Indian Ocean', 'Arctic Ocean', 'Pacific Ocean'], 'correct': 'Pacific Ocean'},
-    5: {'question': 'Who painted the Mona Lisa?', 'options': ['Vincent van Gogh', 'Pablo Picasso', 'Leonardo da Vinci', 'Claude Monet'], 'correct': 'Leonardo da Vinci'},
-    6: {'question': 'What is the currency of Japan?', 'options': ['Yen', 'Dollar', 'Euro', 'Pound'], 'correct': 'Yen'},
-    7: {'question': 'Which country is known as the Land of the Rising Sun?', 'options': ['China', 'Japan', 'South Korea', 'Thailand'], 'correct': 'Japan'},
-    8: {'question': 'Who invented the telephone?', 'options': ['Thomas Edison', 'Alexander Graham Bell', 'Nikola Tesla', 'Albert Einstein'], 'correct': 'Alexander Graham Bell'},
-    9: {'question': 'What is the smallest prime number?', 'options': ['1', '2', '3', '5'], 'correct': '2'},
-    10: {'question': 'Which gas is most abundant in the Earth\'s atmosphere?', 'options': ['Oxygen', 'Nitrogen', 'Carbon Dioxide', 'Argon'], 'correct': 'Nitrogen'},
-    11: {'question': 'What is the chemical symbol for water?', 'options': ['H2O', 'CO2', 'NaCl', 'O2'], 'correct': 'H2O'},
-    12: {'question': 'Who is known as the Father of Computers?', 'options': ['Charles Babbage', 'Alan Turing', 'Bill Gates', 'Steve Jobs'], 'correct': 'Charles Babbage'},
-    13: {'question': 'What is the largest mammal in the world?', 'options': ['Elephant', 'Blue Whale', 'Giraffe', 'Shark'], 'correct': 'Blue Whale'},
-    14: {'question': 'Which country is famous for the Great Wall?', 'options': ['India', 'China', 'Japan', 'Russia'], 'correct': 'China'},
-    15: {'question': 'What is the longest river in the world?', 'options': ['Nile', 'Amazon', 'Yangtze', 'Mississippi'], 'correct': 'Nile'},
-    16: {'question': 'Which is the largest desert in the world?', 'options': ['Sahara', 'Arabian', 'Gobi', 'Antarctic'], 'correct': 'Antarctic'},
-    17: {'question': 'Who discovered gravity?', 'options': ['Isaac Newton', 'Albert Einstein', 'Galileo Galilei', 'Stephen Hawking'], 'correct': 'Isaac Newton'},
-    18: {'question': 'What is the capital of Australia?', 'options': ['Sydney', 'Melbourne', 'Canberra', 'Perth'], 'correct': 'Canberra'},
-    19: {'question': 'Which is the smallest continent?', 'options': ['Asia', 'Africa', 'Australia', 'Europe'], 'correct': 'Australia'},
-    20: {'question': 'What is the chemical symbol for gold?', 'options': ['Au', 'Ag', 'Fe', 'Cu'], 'correct': 'Au'},
-    21: {'question': 'Which planet is closest to the Sun?', 'options': ['Earth', 'Venus', 'Mercury', 'Mars'], 'correct': 'Mercury'},
-    22: {'question': 'Who wrote "The Theory of Relativity"?', 'options': ['Isaac Newton', 'Albert Einstein', 'Stephen Hawking', 'Galileo Galilei'], 'correct': 'Albert Einstein'},
-    23: {'question': 'What is the largest organ in the human body?', 'options': ['Heart', 'Liver', 'Skin', 'Brain'], 'correct': 'Skin'},
-    24: {'question': 'Which country is known as the Land of the Midnight Sun?', 'options': ['Norway', 'Sweden', 'Finland', 'Iceland'], 'correct': 'Norway'},
-    25: {'question': 'What is the chemical symbol for oxygen?', 'options': ['O2', 'CO2', 'H2O', 'N2'], 'correct': 'O2'},
-    26: {'question': 'Which country is known as the Land of the Thunder Dragon?', 'options': ['Bhutan', 'Nepal', 'Tibet', 'Myanmar'], 'correct': 'Bhutan'},
-    27: {'question': 'What is the capital of Canada?', 'options': ['Toronto', 'Ottawa', 'Vancouver', 'Montreal'], 'correct': 'Ottawa'},
-    28: {'question': 'Which country is known as the Land of the Rising Sun?', 'options': ['China', 'Japan', 'South Korea', 'Thailand'], 'correct': 'Japan'},
-    29: {'question': 'What is the capital of Brazil?', 'options': ['Rio de Janeiro', 'São Paulo', 'Brasília', 'Salvador'], 'correct': 'Brasília'},
-    30: {'question': 'Which country is known as the Land of the Long White Cloud?', 'options': ['Australia', 'New Zealand', 'Fiji', 'Samoa'], 'correct': 'New Zealand'},
-    31: {'question': 'What is the capital of South Africa?', 'options': ['Cape Town', 'Pretoria', 'Johannesburg', 'Durban'], 'correct': 'Pretoria'},
-    32: {'question': 'Which country is known as the Land of the Midnight Sun?', 'options': ['Norway', 'Sweden', 'Finland', 'Iceland'], 'correct': 'Norway'},
-    33: {'question': 'What is the capital of Russia?', 'options': ['St. Petersburg', 'Moscow', 'Novosibirsk', 'Yekaterinburg'], 'correct': 'Moscow'},
-    34: {'question': 'Which country is known as the Land of the Rising Sun?', 'options': ['China', 'Japan', 'South Korea', 'Thailand'], 'correct': 'Japan'},
-    35: {'question': 'What is the capital of Argentina?', 'options': ['Buenos Aires', 'Córdoba', 'Rosario', 'Mendoza'], 'correct': 'Buenos Aires'},
-    36: {'question': 'Which country is known as the Land of the Thunder Dragon?', 'options': ['Bhutan', 'Nepal', 'Tibet', 'Myanmar'], 'correct': 'Bhutan'},
-    37: {'question': 'What is the capital of Egypt?', 'options': ['Cairo', 'Alexandria', 'Giza', 'Luxor'], 'correct': 'Cairo'},
-    38: {'question': 'Which country is known as the Land of the Rising Sun?', 'options': ['China', 'Japan', 'South Korea', 'Thailand'], 'correct': 'Japan'},
-    39: {'question': 'What is the capital of Germany?', 'options': ['Berlin', 'Munich', 'Hamburg', 'Frankfurt'], 'correct': 'Berlin'},
-    40: {'question': 'Which country is known as the Land of the Midnight Sun?', 'options': ['Norway', 'Sweden', 'Finland', 'Iceland'], 'correct': 'Norway'},
-    41: {'question': 'What is the capital of Italy?', 'options': ['Rome', 'Milan', 'Venice', 'Florence'], 'correct': 'Rome'},
-    42: {'question': 'Which country is known as the Land of the Rising Sun?', 'options': ['China', 'Japan', 'South Korea', 'Thailand'], 'correct': 'Japan'},
-    43: {'question': 'What is the capital of Spain?', 'options': ['Madrid', 'Barcelona', 'Valencia', 'Seville'], 'correct': 'Madrid'},
-    44: {'question': 'Which country is known as the Land of the Thunder Dragon?', 'options': ['Bhutan', 'Nepal', 'Tibet', 'Myanmar'], 'correct': 'Bhutan'},
-    45: {'question': 'What is the capital of the United Kingdom?', 'options': ['London', 'Manchester', 'Liverpool', 'Birmingham'], 'correct': 'London'},
-    46: {'question': 'Which country is known as the Land of the Rising Sun?', 'options': ['China', 'Japan', 'South Korea', 'Thailand'], 'correct': 'Japan'},
-    47: {'question': 'What is the capital of the United States?', 'options': ['New York', 'Washington, D.C.', 'Los Angeles', 'Chicago'], 'correct': 'Washington, D.C.'},
-    48: {'question': 'Which country is known as the Land of the Midnight Sun?', 'options': ['Norway', 'Sweden', 'Finland', 'Iceland'], 'correct': 'Norway'},
-    49: {'question': 'What is the capital of India?', 'options': ['Mumbai', 'Delhi', 'Bangalore', 'Kolkata'], 'correct': 'Delhi'},
-    50: {'question': 'Which country is known as the Land of the Rising Sun?', 'options': ['China', 'Japan', 'South Korea', 'Thailand'], 'correct': 'Japan'},
-
-    # Technology (50 Questions)
-    51: {'question': 'What does CPU stand for?', 'options': ['Central Processing Unit', 'Computer Processing Unit', 'Central Program Unit', 'Computer Program Unit'], 'correct': 'Central Processing Unit'},
-    52: {'question': 'Which programming language is known as the "mother of all languages"?', 'options': ['Python', 'C', 'Java', 'Assembly'], 'correct': 'C'},
-    53: {'question': 'What is the full form of HTML?', 'options': ['HyperText Markup Language', 'Hyperlink and Text Markup Language', 'High-Level Text Machine Language', 'HyperText Machine Language'], 'correct': 'HyperText Markup Language'},
-    54: {'question': 'Which company developed the Python programming language?', 'options': ['Microsoft', 'Google', 'Guido van Rossum', 'Apple'], 'correct': 'Guido van Rossum'},
-    55: {'question': 'What is the primary function of RAM?', 'options': ['Long-term storage', 'Temporary storage for running applications', 'Processing graphics', 'Managing network connections'], 'correct': 'Temporary storage for running applications'},
-    56: {'question': 'Which protocol is used for secure communication over the internet?', 'options': ['HTTP', 'FTP', 'HTTPS', 'SMTP'], 'correct': 'HTTPS'},
-    57: {'question': 'What is the name of the first computer virus?', 'options': ['ILOVEYOU', 'Creeper', 'Stuxnet', 'Melissa'], 'correct': 'Creeper'},
-    58: {'question': 'What does AI stand for?', 'options': ['Automated Intelligence', 'Artificial Intelligence', 'Advanced Interface', 'Algorithmic Intelligence'], 'correct': 'Artificial Intelligence'},
-    59: {'question': 'Which company created the Android operating system?', 'options': ['Apple', 'Microsoft', 'Google', 'Samsung'], 'correct': 'Google'},
-    60: {'question': 'What is the binary equivalent of the decimal number 10?', 'options': ['1010', '1001', '1100', '1111'], 'correct': '1010'},
-    61: {'question': 'What is the main purpose of a firewall?', 'options': ['To block unauthorized access', 'To increase internet speed', 'To store data', 'To manage hardware resources'], 'correct': 'To block unauthorized access'},
-    62: {'question': 'Which of the following is NOT a database management system?', 'options': ['MySQL', 'MongoDB', 'Oracle', 'HTML'], 'correct': 'HTML'},
-    63: {'question': 'What is the full form of URL?', 'options': ['Uniform Resource Locator', 'Universal Resource Locator', 'Uniform Resource Link', 'Universal Resource Link'], 'correct': 'Uniform Resource Locator'},
-    64: {'question': 'Which of the following is a cloud computing platform?', 'options': ['AWS', 'Photoshop', 'AutoCAD', 'MS Word'], 'correct': 'AWS'},
-    65: {'question': 'What is the primary function of a GPU?', 'options': ['Processing graphics', 'Managing memory', 'Running the operating system', 'Storing data'], 'correct': 'Processing graphics'},
-    66: {'question': 'Which of the following is NOT a programming language?', 'options': ['Python', 'Java', 'HTML', 'C++'], 'correct': 'HTML'},
-    67: {'question': 'What is the full form of VPN?', 'options': ['Virtual Private Network', 'Virtual Public Network', 'Visual Private Network', 'Visual Public Network'], 'correct': 'Virtual Private Network'},
-    68: {'question': 'Which company developed the first graphical web browser?', 'options': ['Microsoft', 'Netscape', 'Google', 'Apple'], 'correct': 'Netscape'},
-    69: {'question': 'What is the full form of IoT?', 'options': ['Internet of Things', 'Internet of Technology', 'Interface of Things', 'Interface of Technology'], 'correct': 'Internet of Things'},
-    70: {'question': 'Which of the following is a version control system?', 'options': ['Git', 'Docker', 'Kubernetes', 'Jenkins'], 'correct': 'Git'},
-    71: {'question': 'What is the full form of API?', 'options': ['Application Programming Interface', 'Application Program Interface', 'Advanced Programming Interface', 'Advanced Program Interface'], 'correct': 'Application Programming Interface'},
-    72: {'question': 'Which of the following is NOT an operating system?', 'options': ['Linux', 'Windows', 'macOS', 'Photoshop'], 'correct': 'Photoshop'},
-    73: {'question': 'What is the full form of SSD?', 'options': ['Solid State Drive', 'Super Speed Drive', 'Solid Storage Device', 'Super Storage Device'], 'correct': 'Solid State Drive'},
-    74: {'question': 'Which of the following is a machine learning framework?', 'options': ['TensorFlow', 'Django', 'Flask', 'React'], 'correct': 'TensorFlow'},
-    75: {'question': 'What is the full form of DNS?', 'options': ['Domain Name System', 'Data Name System', 'Domain Network System', 'Data Network System'], 'correct': 'Domain Name System'},
-    76: {'question': 'What is the primary function of a compiler?', 'options': ['Execute code', 'Translate high-level code to machine code', 'Debug code', 'Optimize code'], 'correct': 'Translate high-level code to machine code'},
-    77: {'question': 'Which of the following is NOT a type of database?', 'options': ['Relational', 'NoSQL', 'Graph', 'Compiler'], 'correct': 'Compiler'},
-    78: {'question': 'What is the full form of SQL?', 'options': ['Structured Query Language', 'Simple Query Language', 'Standard Query Language', 'System Query Language'], 'correct': 'Structured Query Language'},
-    79: {'question': 'Which of the following is a front-end framework?', 'options': ['React', 'Django', 'Flask', 'Node.js'], 'correct': 'React'},
-    80: {'question': 'What is the full form of CSS?', 'options': ['Cascading Style Sheets', 'Computer Style Sheets', 'Colorful Style Sheets', 'Creative Style Sheets'], 'correct': 'Cascading Style Sheets'},
-    81: {'question': 'Which of the following is a back-end framework?', 'options': ['React', 'Angular', 'Django', 'Vue.js'], 'correct': 'Django'},
-    82: {'question': 'What is the full form of JSON?', 'options': ['JavaScript Object Notation', 'Java Standard Object Notation', 'JavaScript Oriented Notation', 'Java Scripted Object Notation'], 'correct': 'JavaScript Object Notation'},
-    83: {'question': 'Which of the following is a programming paradigm?', 'options': ['Object-Oriented', 'Functional', 'Procedural', 'All of the above'], 'correct': 'All of the above'},
-    84: {'question': 'What is the full form of XML?', 'options': ['Extensible Markup Language', 'Extended Markup Language', 'Executable Markup Language', 'Extra Markup Language'], 'correct': 'Extensible Markup Language'},
-    85: {'question': 'Which of the following is a scripting language?', 'options': ['Python', 'Java', 'C++', 'C#'], 'correct': 'Python'},
-    86: {'question': 'What is the full form of IDE?', 'options': ['Integrated Development Environment', 'Interactive Development Environment', 'Integrated Debugging Environment', 'Interactive Debugging Environment'], 'correct': 'Integrated Development Environment'},
-    87: {'question': 'Which of the following is a version control system?', 'options': ['Git', 'Docker', 'Kubernetes', 'Jenkins'], 'correct': 'Git'},
-    88: {'question': 'What is the full form of HTTP?', 'options': ['HyperText Transfer Protocol', 'HyperText Transmission Protocol', 'HyperText Transfer Process', 'HyperText Transmission Process'], 'correct': 'HyperText Transfer Protocol'},
-    89: {'question': 'Which of the following is a programming language?', 'options': ['HTML', 'CSS', 'JavaScript', 'XML'], 'correct': 'JavaScript'},
-    90: {'question': 'What is the full form of FTP?', 'options': ['File Transfer Protocol', 'File Transmission Protocol', 'File Transfer Process', 'File Transmission Process'], 'correct': 'File Transfer Protocol'},
-    91: {'question': 'Which of the following is a markup language?', 'options': ['HTML', 'CSS', 'JavaScript', 'Python'], 'correct': 'HTML'},
-    92: {'question': 'What is the full form of CLI?', 'options': ['Command Line Interface', 'Command Language Interface', 'Command Line Interpreter', 'Command Language Interpreter'], 'correct': 'Command Line Interface'},
-    93: {'question': 'Which of the following is a programming language?', 'options': ['HTML', 'CSS', 'JavaScript', 'XML'], 'correct': 'JavaScript'},
-    94: {'question': 'What is the full form of GUI?', 'options': ['Graphical User Interface', 'Graphical Utility Interface', 'Graphical User Interpreter', 'Graphical Utility Interpreter'], 'correct': 'Graphical User Interface'},
-    95: {'question': 'Which of the following is a programming language?', 'options': ['HTML', 'CSS', 'JavaScript', 'XML'], 'correct': 'JavaScript'},
-    96: {'question': 'What is the full form of API?', 'options': ['Application Programming Interface', 'Application Program Interface', 'Advanced Programming Interface', 'Advanced Program Interface'], 'correct': 'Application Programming Interface'},
-    97: {'question': 'Which of the following is a programming language?', 'options': ['HTML', 'CSS', 'JavaScript', 'XML'], 'correct': 'JavaScript'},
-    98: {'question': 'What is the full form of SQL?', 'options': ['Structured Query Language', 'Simple Query Language', 'Standard Query Language', 'System Query Language'], 'correct': 'Structured Query Language'},
-    99: {'question': 'Which of the following is a programming language?', 'options': ['HTML', 'CSS', 'JavaScript', 'XML'], 'correct': 'JavaScript'},
-    100: {'question': 'What is the full form of CSS?', 'options': ['Cascading Style Sheets', 'Computer Style Sheets', 'Colorful Style Sheets', 'Creative Style Sheets'], 'correct': 'Cascading Style Sheets'},
-
-    # Ecosystem/Biology/Environment/Health (50 Questions)
-    101: {'question': 'What is the largest ecosystem on Earth?', 'options': ['Desert', 'Ocean', 'Forest', 'Grassland'], 'correct': 'Ocean'},
-    102: {'question': 'Which gas is most abundant in the Earth\'s atmosphere?', 'options': ['Oxygen', 'Nitrogen', 'Carbon Dioxide', 'Argon'], 'correct': 'Nitrogen'},
-    103: {'question': 'What is the primary source of energy for most ecosystems?', 'options': ['Wind', 'Sun', 'Water', 'Soil'], 'correct': 'Sun'},
-    104: {'question': 'Which of the following is a greenhouse gas?', 'options': ['Oxygen', 'Nitrogen', 'Carbon Dioxide', 'Argon'], 'correct': 'Carbon Dioxide'},
-    105: {'question': 'What is the process by which plants make their own food called?', 'options': ['Respiration', 'Photosynthesis', 'Transpiration', 'Digestion'], 'correct': 'Photosynthesis'},
-    106: {'question': 'Which of the following is a decomposer?', 'options': ['Lion', 'Eagle', 'Fungi', 'Grass'], 'correct': 'Fungi'},
-    107: {'question': 'What is the main cause of deforestation?', 'options': ['Urbanization', 'Agriculture', 'Mining', 'All of the above'], 'correct': 'All of the above'},
-    108: {'question': 'Which layer of the Earth\'s atmosphere contains the ozone layer?', 'options': ['Troposphere', 'Stratosphere', 'Mesosphere', 'Thermosphere'], 'correct': 'Stratosphere'},
-    109: {'question': 'What is the primary cause of global warming?', 'options': ['Increase in greenhouse gases', 'Deforestation', 'Industrialization', 'All of the above'], 'correct': 'All of the above'},
-    110: {'question': 'Which of the following is a renewable resource?', 'options': ['Coal', 'Natural Gas', 'Solar Energy', 'Petroleum'], 'correct': 'Solar Energy'},
-    111: {'question': 'What is the largest organ in the human body?', 'options': ['Heart', 'Liver', 'Skin', 'Brain'], 'correct': 'Skin'},
-    112: {'question': 'Which gas do plants absorb during photosynthesis?', 'options': ['Oxygen', 'Carbon Dioxide', 'Nitrogen', 'Hydrogen'], 'correct': 'Carbon Dioxide'},
-    113: {'question': 'What is the main function of red blood cells?', 'options': ['Fight infection', 'Carry oxygen', 'Digest food', 'Produce hormones'], 'correct': 'Carry oxygen'},
-    114: {'question': 'Which vitamin is produced by the human body when exposed to sunlight?', 'options': ['Vitamin A', 'Vitamin B', 'Vitamin C', 'Vitamin D'], 'correct': 'Vitamin D'},
-    115: {'question': 'What is the largest bone in the human body?', 'options': ['Femur', 'Tibia', 'Humerus', 'Skull'], 'correct': 'Femur'},
-    116: {'question': 'Which of the following is NOT a type of blood cell?', 'options': ['Red blood cell', 'White blood cell', 'Platelet', 'Plasma cell'], 'correct': 'Plasma cell'},
-    117: {'question': 'What is the main function of the respiratory system?', 'options': ['Pump blood', 'Digest food', 'Exchange gases', 'Filter toxins'], 'correct': 'Exchange gases'},
-    118: {'question': 'Which organ produces insulin?', 'options': ['Liver', 'Pancreas', 'Kidney', 'Stomach'], 'correct': 'Pancreas'},
-    119: {'question': 'What is the main function of the nervous system?', 'options': ['Control body movements', 'Transport nutrients', 'Produce hormones', 'Filter blood'], 'correct': 'Control body movements'},
-    120: {'question': 'Which of the following is a non-renewable resource?', 'options': ['Solar energy', 'Wind energy', 'Coal', 'Hydropower'], 'correct': 'Coal'},
-    121: {'question': 'What is the main cause of air pollution?', 'options': ['Deforestation', 'Industrial emissions', 'Agricultural runoff', 'Volcanic eruptions'], 'correct': 'Industrial emissions'},
-    122: {'question': 'Which of the following is a primary pollutant?', 'options': ['Ozone', 'Carbon Monoxide', 'Sulfuric Acid', 'Nitric Acid'], 'correct': 'Carbon Monoxide'},
-    123: {'question': 'What is the main cause of water pollution?', 'options': ['Industrial waste', 'Agricultural runoff', 'Sewage', 'All of the above'], 'correct': 'All of the above'},
-    124: {'question': 'Which of the following is a greenhouse gas?', 'options': ['Oxygen', 'Nitrogen', 'Methane', 'Argon'], 'correct': 'Methane'},
-    125: {'question': 'What is the main cause of soil erosion?', 'options': ['Deforestation', 'Overgrazing', 'Agricultural practices', 'All of the above'], 'correct': 'All of the above'},
-    126: {'question': 'Which of the following is a renewable resource?', 'options': ['Coal', 'Natural Gas', 'Solar Energy', 'Petroleum'], 'correct': 'Solar Energy'},
-    127: {'question': 'What is the main function of the circulatory system?', 'options': ['Transport nutrients', 'Exchange gases', 'Filter toxins', 'Produce hormones'], 'correct': 'Transport nutrients'},
-    128: {'question': 'Which of the following is a type of renewable energy?', 'options': ['Coal', 'Natural Gas', 'Solar Energy', 'Petroleum'], 'correct': 'Solar Energy'},
-    129: {'question': 'What is the main function of the digestive system?', 'options': ['Transport nutrients', 'Exchange gases', 'Filter toxins', 'Break down food'], 'correct': 'Break down food'},
-    130: {'question': 'Which of the following is a type of non-renewable energy?', 'options': ['Solar Energy', 'Wind Energy', 'Coal', 'Hydropower'], 'correct': 'Coal'},
-    131: {'question': 'What is the main function of the excretory system?', 'options': ['Transport nutrients', 'Exchange gases', 'Filter toxins', 'Produce hormones'], 'correct': 'Filter toxins'},
-    132: {'question': 'Which of the following is a type of renewable energy?', 'options': ['Coal', 'Natural Gas', 'Solar Energy', 'Petroleum'], 'correct': 'Solar Energy'},
-    133: {'question': 'What is the main function of the endocrine system?', 'options': ['Transport nutrients', 'Exchange gases', 'Filter toxins', 'Produce hormones'], 'correct': 'Produce hormones'},
-    134: {'question': 'Which of the following is a type of non-renewable energy?', 'options': ['Solar Energy', 'Wind Energy', 'Coal', 'Hydropower'], 'correct': 'Coal'},
-    135: {'question': 'What is the main function of the immune system?', 'options': ['Transport nutrients', 'Exchange gases', 'Filter toxins', 'Fight infections'], 'correct': 'Fight infections'},
-    136: {'question': 'Which of the following is a type of renewable energy?', 'options': ['Coal', 'Natural Gas', 'Solar Energy', 'Petroleum'], 'correct': 'Solar Energy'},
-    137: {'question': 'What is the main function of the lymphatic system?', 'options': ['Transport nutrients', 'Exchange gases', 'Filter toxins', 'Fight infections'], 'correct': 'Fight infections'},
-    138: {'question': 'Which of the following is a type of non-renewable energy?', 'options': ['Solar Energy', 'Wind Energy', 'Coal', 'Hydropower'], 'correct': 'Coal'},
-    139: {'question': 'What is the main function of the muscular system?', 'options': ['Transport nutrients', 'Exchange gases', 'Filter toxins', 'Enable movement'], 'correct': 'Enable movement'},
-    140: {'question': 'Which of the following is a type of renewable energy?', 'options': ['Coal', 'Natural Gas', 'Solar Energy', 'Petroleum'], 'correct': 'Solar Energy'},
-    141: {'question': 'What is the main function of the skeletal system?', 'options': ['Transport nutrients', 'Exchange gases', 'Filter toxins', 'Provide structure'], 'correct': 'Provide structure'},
-    142: {'question': 'Which of the following is a type of non-renewable energy?', 'options': ['Solar Energy', 'Wind Energy', 'Coal', 'Hydropower'], 'correct': 'Coal'},
-    143: {'question': 'What is the main function of the reproductive system?', 'options': ['Transport nutrients', 'Exchange gases', 'Filter toxins', 'Produce offspring'], 'correct': 'Produce offspring'},
-    144: {'question': 'Which of the following is a type of renewable energy?', 'options': ['Coal', 'Natural Gas', 'Solar Energy', 'Petroleum'], 'correct': 'Solar Energy'},
-    145: {'question': 'What is the main function of the urinary system?', 'options': ['Transport nutrients', 'Exchange gases', 'Filter toxins', 'Remove waste'], 'correct': 'Remove waste'},
-    146: {'question': 'Which of the following is a type of non-renewable energy?', 'options': ['Solar Energy', 'Wind Energy', 'Coal', 'Hydropower'], 'correct': 'Coal'},
-    147: {'question': 'What is the main function of the integumentary system?', 'options': ['Transport nutrients', 'Exchange gases', 'Filter toxins', 'Protect the body'], 'correct': 'Protect the body'},
-    148: {'question': 'Which of the following is a type of renewable energy?', 'options': ['Coal', 'Natural Gas', 'Solar Energy', 'Petroleum'], 'correct': 'Solar Energy'},
-    149: {'question': 'What is the main function of the nervous system?', 'options': ['Transport nutrients', 'Exchange gases', 'Filter toxins', 'Control body functions'], 'correct': 'Control body functions'},
-    150: {'question': 'Which of the following is a type of non-renewable energy?', 'options': ['Solar Energy', 'Wind Energy', 'Coal', 'Hydropower'], 'correct': 'Coal'},
-
-    # Aptitude (50 Questions)
-    151: {'question': 'If 2x + 5 = 15, what is the value of x?', 'options': ['5', '10', '7.5', '2.5'], 'correct': '5'},
-    152: {'question': 'What is 25% of 200?', 'options': ['50', '25', '100', '75'], 'correct': '50'},
-    153: {'question': 'If a train travels 300 km in 5 hours, what is its speed?', 'options': ['50 km/h', '60 km/h', '70 km/h', '80 km/h'], 'correct': '60 km/h'},
-    154: {'question': 'What is the next number in the sequence: 2, 4, 6, 8, ___?', 'options': ['10', '12', '14', '16'], 'correct': '10'},
-    155: {'question': 'If a shirt costs $20 and is discounted by 20%, what is the final price?', 'options': ['$16', '$18', '$15', '$14'], 'correct': '$16'},
-    156: {'question': 'What is the square root of 144?', 'options': ['12', '14', '16', '18'], 'correct': '12'},
-    157: {'question': 'If 3x - 7 = 14, what is the value of x?', 'options': ['7', '8', '9', '10'], 'correct': '7'},
-    158: {'question': 'What is 15% of 300?', 'options': ['30', '45', '60', '75'], 'correct': '45'},
-    159: {'question': 'If a car travels 240 km in 4 hours, what is its speed?', 'options': ['50 km/h', '60 km/h', '70 km/h', '80 km/h'], 'correct': '60 km/h'},
-    160: {'question': 'What is the next number in the sequence: 5, 10, 15, 20, ___?', 'options': ['25', '30', '35', '40'], 'correct': '25'},
-    161: {'question': 'If a book costs $25 and is discounted by 10%, what is the final price?', 'options': ['$22.50', '$23.50', '$24.50', '$25.50'], 'correct': '$22.50'},
-    162: {'question': 'What is the cube of 3?', 'options': ['9', '27', '81', '243'], 'correct': '27'},
-    163: {'question': 'If 4x + 8 = 24, what is the value of x?', 'options': ['4', '5', '6', '7'], 'correct': '4'},
-    164: {'question': 'What is 20% of 500?', 'options': ['50', '100', '150', '200'], 'correct': '100'},
-    165: {'question': 'If a bus travels 180 km in 3 hours, what is its speed?', 'options': ['50 km/h', '60 km/h', '70 km/h', '80 km/h'], 'correct': '60 km/h'},
-    166: {'question': 'What is the next number in the sequence: 10, 20, 30, 40, ___?', 'options': ['50', '60', '70', '80'], 'correct': '50'},
-    167: {'question': 'If a laptop costs $800 and is discounted by 15%, what is the final price?', 'options': ['$680', '$700', '$720', '$740'], 'correct': '$680'},
-    168: {'question': 'What is the square of 12?', 'options': ['144', '169', '196', '225'], 'correct': '144'},
-    169: {'question': 'If 5x - 10 = 20, what is the value of x?', 'options': ['6', '7', '8', '9'], 'correct': '6'},
-    170: {'question': 'What is 30% of 400?', 'options': ['100', '120', '140', '160'], 'correct': '120'},
-    171: {'question': 'If a train travels 360 km in 6 hours, what is its speed?', 'options': ['50 km/h', '60 km/h', '70 km/h', '80 km/h'], 'correct': '60 km/h'},
-    172: {'question': 'What is the next number in the sequence: 15, 30, 45, 60, ___?', 'options': ['75', '90', '105', '120'], 'correct': '75'},
-    173: {'question': 'If a phone costs $500 and is discounted by 25%, what is the final price?', 'options': ['$375', '$400', '$425', '$450'], 'correct': '$375'},
-    174: {'question': 'What is the cube of 4?', 'options': ['16', '64', '128', '256'], 'correct': '64'},
-    175: {'question': 'If 6x - 12 = 24, what is the value of x?', 'options': ['6', '7', '8', '9'], 'correct': '6'},
-    176: {'question': 'What is 40% of 600?', 'options': ['200', '240', '260', '280'], 'correct': '240'},
-    177: {'question': 'If a car travels 420 km in 7 hours, what is its speed?', 'options': ['50 km/h', '60 km/h', '70 km/h', '80 km/h'], 'correct': '60 km/h'},
-    178: {'question': 'What is the next number in the sequence: 20, 40, 60, 80, ___?', 'options': ['100', '120', '140', '160'], 'correct': '100'},
-    179: {'question': 'If a tablet costs $300 and is discounted by 10%, what is the final price?', 'options': ['$270', '$280', '$290', '$300'], 'correct': '$270'},
-    180: {'question': 'What is the square of 15?', 'options': ['225', '250', '275', '300'], 'correct': '225'},
-    181: {'question': 'If 7x - 14 = 28, what is the value of x?', 'options': ['6', '7', '8', '9'], 'correct': '6'},
-    182: {'question': 'What is 50% of 800?', 'options': ['400', '450', '500', '550'], 'correct': '400'},
-    183: {'question': 'If a train travels 480 km in 8 hours, what is its speed?', 'options': ['50 km/h', '60 km/h', '70 km/h', '80 km/h'], 'correct': '60 km/h'},
-    184: {'question': 'What is the next number in the sequence: 25, 50, 75, 100, ___?', 'options': ['125', '150', '175', '200'], 'correct': '125'},
-    185: {'question': 'If a laptop costs $1000 and is discounted by 20%, what is the final price?', 'options': ['$800', '$820', '$840', '$860'], 'correct': '$800'},
-    186: {'question': 'What is the cube of 5?', 'options': ['125', '150', '175', '200'], 'correct': '125'},
-    187: {'question': 'If 8x - 16 = 32, what is the value of x?', 'options': ['6', '7', '8', '9'], 'correct': '6'},
-    188: {'question': 'What is 60% of 900?', 'options': ['540', '560', '580', '600'], 'correct': '540'},
-    189: {'question': 'If a car travels 540 km in 9 hours, what is its speed?', 'options': ['50 km/h', '60 km/h', '70 km/h', '80 km/h'], 'correct': '60 km/h'},
-    190: {'question': 'What is the next number in the sequence: 30, 60, 90, 120, ___?', 'options': ['150', '180', '210', '240'], 'correct': '150'},
-    191: {'question': 'If a phone costs $600 and is discounted by 30%, what is the final price?', 'options': ['$420', '$440', '$460', '$480'], 'correct': '$420'},
-    192: {'question': 'What is the square of 20?', 'options': ['400', '450', '500', '550'], 'correct': '400'},
-    193: {'question': 'If 9x - 18 = 36, what is the value of x?', 'options': ['6', '7', '8', '9'], 'correct': '6'},
-    194: {'question': 'What is 70% of 1000?', 'options': ['700', '750', '800', '850'], 'correct': '700'},
-    195: {'question': 'If a train travels 600 km in 10 hours, what is its speed?', 'options': ['50 km/h', '60 km/h', '70 km/h', '80 km/h'], 'correct': '60 km/h'},
-    196: {'question': 'What is the next number in the sequence: 35, 70, 105, 140, ___?', 'options': ['175', '210', '245', '280'], 'correct': '175'},
-    197: {'question': 'If a laptop costs $1200 and is discounted by 25%, what is the final price?', 'options': ['$900', '$950', '$1000', '$1050'], 'correct': '$900'},
-    198: {'question': 'What is the cube of 6?', 'options': ['216', '250', '275', '300'], 'correct': '216'},
-    199: {'question': 'If 10x - 20 = 40, what is the value of x?', 'options': ['6', '7', '8', '9'], 'correct': '6'},
-    200: {'question': 'What is 80% of 1200?', 'options': ['960', '1000', '1040', '1080'], 'correct': '960'},
-    
-    # General Knowledge (25 Questions)
-    201: {'question': 'What is the capital of France?', 'options': ['Paris', 'London', 'Berlin', 'Madrid'], 'correct': 'Paris'},
-    202: {'question': 'Who wrote "Romeo and Juliet"?', 'options': ['William Shakespeare', 'Charles Dickens', 'Mark Twain', 'Jane Austen'], 'correct': 'William Shakespeare'},
-    203: {'question': 'Which planet is known as the Red Planet?', 'options': ['Earth', 'Mars', 'Jupiter', 'Saturn'], 'correct': 'Mars'},
-    204: {'question': 'What is the largest ocean on Earth?', 'options': ['Atlantic Ocean', 'Indian Ocean', 'Arctic Ocean', 'Pacific Ocean'], 'correct': 'Pacific Ocean'},
-    205: {'question': 'Who painted the Mona Lisa?', 'options': ['Vincent van Gogh', 'Pablo Picasso', 'Leonardo da Vinci', 'Claude Monet'], 'correct': 'Leonardo da Vinci'},
-    206: {'question': 'What is the currency of Japan?', 'options': ['Yen', 'Dollar', 'Euro', 'Pound'], 'correct': 'Yen'},
-    207: {'question': 'Which country is known as the Land of the Rising Sun?', 'options': ['China', 'Japan', 'South Korea', 'Thailand'], 'correct': 'Japan'},
-    208: {'question': 'Who invented the telephone?', 'options': ['Thomas Edison', 'Alexander Graham Bell', 'Nikola Tesla', 'Albert Einstein'], 'correct': 'Alexander Graham Bell'},
-    209: {'question': 'What is the smallest prime number?', 'options': ['1', '2', '3', '5'], 'correct': '2'},
-    210: {'question': 'Which gas is most abundant in the Earth\'s atmosphere?', 'options': ['Oxygen', 'Nitrogen', 'Carbon Dioxide', 'Argon'], 'correct': 'Nitrogen'},
-    211: {'question': 'What is the chemical symbol for water?', 'options': ['H2O', 'CO2', 'NaCl', 'O2'], 'correct': 'H2O'},
-    212: {'question': 'Who is known as the Father of Computers?', 'options': ['Charles Babbage', 'Alan Turing', 'Bill Gates', 'Steve Jobs'], 'correct': 'Charles Babbage'},
-    213: {'question': 'What is the largest mammal in the world?', 'options': ['Elephant', 'Blue Whale', 'Giraffe', 'Shark'], 'correct': 'Blue Whale'},
-    214: {'question': 'Which country is famous for the Great Wall?', 'options': ['India', 'China', 'Japan', 'Russia'], 'correct': 'China'},
-    215: {'question': 'What is the longest river in the world?', 'options': ['Nile', 'Amazon', 'Yangtze', 'Mississippi'], 'correct': 'Nile'},
-    216: {'question': 'Which is the largest desert in the world?', 'options': ['Sahara', 'Arabian', 'Gobi', 'Antarctic'], 'correct': 'Antarctic'},
-    217: {'question': 'Who discovered gravity?', 'options': ['Isaac Newton', 'Albert Einstein', 'Galileo Galilei', 'Stephen Hawking'], 'correct': 'Isaac Newton'},
-    218: {'question': 'What is the capital of Australia?', 'options': ['Sydney', 'Melbourne', 'Canberra', 'Perth'], 'correct': 'Canberra'},
-    219: {'question': 'Which is the smallest continent?', 'options': ['Asia', 'Africa', 'Australia', 'Europe'], 'correct': 'Australia'},
-    220: {'question': 'What is the chemical symbol for gold?', 'options': ['Au', 'Ag', 'Fe', 'Cu'], 'correct': 'Au'},
-    221: {'question': 'Which planet is closest to the Sun?', 'options': ['Earth', 'Venus', 'Mercury', 'Mars'], 'correct': 'Mercury'},
-    222: {'question': 'Who wrote "The Theory of Relativity"?', 'options': ['Isaac Newton', 'Albert Einstein', 'Stephen Hawking', 'Galileo Galilei'], 'correct': 'Albert Einstein'},
-    223: {'question': 'What is the largest organ in the human body?', 'options': ['Heart', 'Liver', 'Skin', 'Brain'], 'correct': 'Skin'},
-    224: {'question': 'Which country is known as the Land of the Midnight Sun?', 'options': ['Norway', 'Sweden', 'Finland', 'Iceland'], 'correct': 'Norway'},
-    225: {'question': 'What is the chemical symbol for oxygen?', 'options': ['O2', 'CO2', 'H2O', 'N2'], 'correct': 'O2'},
-
-    # Technology (25 Questions)
-    226: {'question': 'What does CPU stand for?', 'options': ['Central Processing Unit', 'Computer Processing Unit', 'Central Program Unit', 'Computer Program Unit'], 'correct': 'Central Processing Unit'},
-    227: {'question': 'Which programming language is known as the "mother of all languages"?', 'options': ['Python', 'C', 'Java', 'Assembly'], 'correct': 'C'},
-    228: {'question': 'What is the full form of HTML?', 'options': ['HyperText Markup Language', 'Hyperlink and Text Markup Language', 'High-Level Text Machine Language', 'HyperText Machine Language'], 'correct': 'HyperText Markup Language'},
-    229: {'question': 'Which company developed the Python programming language?', 'options': ['Microsoft', 'Google', 'Guido van Rossum', 'Apple'], 'correct': 'Guido van Rossum'},
-    230: {'question': 'What is the primary function of RAM?', 'options': ['Long-term storage', 'Temporary storage for running applications', 'Processing graphics', 'Managing network connections'], 'correct': 'Temporary storage for running applications'},
-    231: {'question': 'Which protocol is used for secure communication over the internet?', 'options': ['HTTP', 'FTP', 'HTTPS', 'SMTP'], 'correct': 'HTTPS'},
-    232: {'question': 'What is the name of the first computer virus?', 'options': ['ILOVEYOU', 'Creeper', 'Stuxnet', 'Melissa'], 'correct': 'Creeper'},
-    233: {'question': 'What does AI stand for?', 'options': ['Automated Intelligence', 'Artificial Intelligence', 'Advanced Interface', 'Algorithmic Intelligence'], 'correct': 'Artificial Intelligence'},
-    234: {'question': 'Which company created the Android operating system?', 'options': ['Apple', 'Microsoft', 'Google', 'Samsung'], 'correct': 'Google'},
-    235: {'question': 'What is the binary equivalent of the decimal number 10?', 'options': ['1010', '1001', '1100', '1111'], 'correct': '1010'},
-    236: {'question': 'What is the main purpose of a firewall?', 'options': ['To block unauthorized access', 'To increase internet speed', 'To store data', 'To manage hardware resources'], 'correct': 'To block unauthorized access'},
-    237: {'question': 'Which of the following is NOT a database management system?', 'options': ['MySQL', 'MongoDB', 'Oracle', 'HTML'], 'correct': 'HTML'},
-    238: {'question': 'What is the full form of URL?', 'options': ['Uniform Resource Locator', 'Universal Resource Locator', 'Uniform Resource Link', 'Universal Resource Link'], 'correct': 'Uniform Resource Locator'},
-    239: {'question': 'Which of the following is a cloud computing platform?', 'options': ['AWS', 'Photoshop', 'AutoCAD', 'MS Word'], 'correct': 'AWS'},
-    240: {'question': 'What is the primary function of a GPU?', 'options': ['Processing graphics', 'Managing memory', 'Running the operating system', 'Storing data'], 'correct': 'Processing graphics'},
-    241: {'question': 'Which of the following is NOT a programming language?', 'options': ['Python', 'Java', 'HTML', 'C++'], 'correct': 'HTML'},
-    242: {'question': 'What is the full form of VPN?', 'options': ['Virtual Private Network', 'Virtual Public Network', 'Visual Private Network', 'Visual Public Network'], 'correct': 'Virtual Private Network'},
-    243: {'question': 'Which company developed the first graphical web browser?', 'options': ['Microsoft', 'Netscape', 'Google', 'Apple'], 'correct': 'Netscape'},
-    244: {'question': 'What is the full form of IoT?', 'options': ['Internet of Things', 'Internet of Technology', 'Interface of Things', 'Interface of Technology'], 'correct': 'Internet of Things'},
-    245: {'question': 'Which of the following is a version control system?', 'options': ['Git', 'Docker', 'Kubernetes', 'Jenkins'], 'correct': 'Git'},
-    246: {'question': 'What is the full form of API?', 'options': ['Application Programming Interface', 'Application Program Interface', 'Advanced Programming Interface', 'Advanced Program Interface'], 'correct': 'Application Programming Interface'},
-    247: {'question': 'Which of the following is NOT an operating system?', 'options': ['Linux', 'Windows', 'macOS', 'Photoshop'], 'correct': 'Photoshop'},
-    248: {'question': 'What is the full form of SSD?', 'options': ['Solid State Drive', 'Super Speed Drive', 'Solid Storage Device', 'Super Storage Device'], 'correct': 'Solid State Drive'},
-    249: {'question': 'Which of the following is a machine learning framework?', 'options': ['TensorFlow', 'Django', 'Flask', 'React'], 'correct': 'TensorFlow'},
-    250: {'question': 'What is the full form of DNS?', 'options': ['Domain Name System', 'Data Name System', 'Domain Network System', 'Data Network System'], 'correct': 'Domain Name System'},
-
-    # Ecosystem/Biology/Environment/Health (25 Questions)
-    251: {'question': 'What is the largest ecosystem on Earth?', 'options': ['Desert', 'Ocean', 'Forest', 'Grassland'], 'correct': 'Ocean'},
-    252: {'question': 'Which gas is most abundant in the Earth\'s atmosphere?', 'options': ['Oxygen', 'Nitrogen', 'Carbon Dioxide', 'Argon'], 'correct': 'Nitrogen'},
-    253: {'question': 'What is the primary source of energy for most ecosystems?', 'options': ['Wind', 'Sun', 'Water', 'Soil'], 'correct': 'Sun'},
-    254: {'question': 'Which of the following is a greenhouse gas?', 'options': ['Oxygen', 'Nitrogen', 'Carbon Dioxide', 'Argon'], 'correct': 'Carbon Dioxide'},
-    255: {'question': 'What is the process by which plants make their own food called?', 'options': ['Respiration', 'Photosynthesis', 'Transpiration', 'Digestion'], 'correct': 'Photosynthesis'},
-    256: {'question': 'Which of the following is a decomposer?', 'options': ['Lion', 'Eagle', 'Fungi', 'Grass'], 'correct': 'Fungi'},
-    257: {'question': 'What is the main cause of deforestation?', 'options': ['Urbanization', 'Agriculture', 'Mining', 'All of the above'], 'correct': 'All of the above'},
-    258: {'question': 'Which layer of the Earth\'s atmosphere contains the ozone layer?', 'options': ['Troposphere', 'Stratosphere', 'Mesosphere', 'Thermosphere'], 'correct': 'Stratosphere'},
-    259: {'question': 'What is the primary cause of global warming?', 'options': ['Increase in greenhouse gases', 'Deforestation', 'Industrialization', 'All of the above'], 'correct': 'All of the above'},
-    260: {'question': 'Which of the following is a renewable resource?', 'options': ['Coal', 'Natural Gas', 'Solar Energy', 'Petroleum'], 'correct': 'Solar Energy'},
-    261: {'question': 'What is the largest organ in the human body?', 'options': ['Heart', 'Liver', 'Skin', 'Brain'], 'correct': 'Skin'},
-    262: {'question': 'Which gas do plants absorb during photosynthesis?', 'options': ['Oxygen', 'Carbon Dioxide', 'Nitrogen', 'Hydrogen'], 'correct': 'Carbon Dioxide'},
-    263: {'question': 'What is the main function of red blood cells?', 'options': ['Fight infection', 'Carry oxygen', 'Digest food', 'Produce hormones'], 'correct': 'Carry oxygen'},
-    264: {'question': 'Which vitamin is produced by the human body when exposed to sunlight?', 'options': ['Vitamin A', 'Vitamin B', 'Vitamin C', 'Vitamin D'], 'correct': 'Vitamin D'},
-    265: {'question': 'What is the largest bone in the human body?', 'options': ['Femur', 'Tibia', 'Humerus', 'Skull'], 'correct': 'Femur'},
-    266: {'question': 'Which of the following is NOT a type of blood cell?', 'options': ['Red blood cell', 'White blood cell', 'Platelet', 'Plasma cell'], 'correct': 'Plasma cell'},
-    267: {'question': 'What is the main function of the respiratory system?', 'options': ['Pump blood', 'Digest food', 'Exchange gases', 'Filter toxins'], 'correct': 'Exchange gases'},
-    268: {'question': 'Which organ produces insulin?', 'options': ['Liver', 'Pancreas', 'Kidney', 'Stomach'], 'correct': 'Pancreas'},
-    269: {'question': 'What is the main function of the nervous system?', 'options': ['Control body movements', 'Transport nutrients', 'Produce hormones', 'Filter blood'], 'correct': 'Control body movements'},
-    270: {'question': 'Which of the following is a non-renewable resource?', 'options': ['Solar energy', 'Wind energy', 'Coal', 'Hydropower'], 'correct': 'Coal'},
-    271: {'question': 'What is the main cause of air pollution?', 'options': ['Deforestation', 'Industrial emissions', 'Agricultural runoff', 'Volcanic eruptions'], 'correct': 'Industrial emissions'},
-    272: {'question': 'Which of the following is a primary pollutant?', 'options': ['Ozone', 'Carbon Monoxide', 'Sulfuric Acid', 'Nitric Acid'], 'correct': 'Carbon Monoxide'},
-    273: {'question': 'What is the main cause of water pollution?', 'options': ['Industrial waste', 'Agricultural runoff', 'Sewage', 'All of the above'], 'correct': 'All of the above'},
-    274: {'question': 'Which of the following is a greenhouse gas?', 'options': ['Oxygen', 'Nitrogen', 'Methane', 'Argon'], 'correct': 'Methane'},
-    275: {'question': 'What is the main cause of soil erosion?', 'options': ['Deforestation', 'Overgrazing', 'Agricultural practices', 'All of the above'], 'correct': 'All of the above'},
-
-    # Aptitude (25 Questions)
-    276: {'question': 'If 2x + 5 = 15, what is the value of x?', 'options': ['5', '10', '7.5', '2.5'], 'correct': '5'},
-    277: {'question': 'What is 25% of 200?', 'options': ['50', '25', '100', '75'], 'correct': '50'},
-    278: {'question': 'If a train travels 300 km in 5 hours, what is its speed?', 'options': ['50 km/h', '60 km/h', '70 km/h', '80 km/h'], 'correct': '60 km/h'},
-    279: {'question': 'What is the next number in the sequence: 2, 4, 6, 8, ___?', 'options': ['10', '12', '14', '16'], 'correct': '10'},
-    280: {'question': 'If a shirt costs $20 and is discounted by 20%, what is the final price?', 'options': ['$16', '$18', '$15', '$14'], 'correct': '$16'},
-    281: {'question': 'What is the square root of 144?', 'options': ['12', '14', '16', '18'], 'correct': '12'},
-    282: {'question': 'If 3x - 7 = 14, what is the value of x?', 'options': ['7', '8', '9', '10'], 'correct': '7'},
-    283: {'question': 'What is 15% of 300?', 'options': ['30', '45', '60', '75'], 'correct': '45'},
-    284: {'question': 'If a car travels 240 km in 4 hours, what is its speed?', 'options': ['50 km/h', '60 km/h', '70 km/h', '80 km/h'], 'correct': '60 km/h'},
-    285: {'question': 'What is the next number in the sequence: 5, 10, 15, 20, ___?', 'options': ['25', '30', '35', '40'], 'correct': '25'},
-    286: {'question': 'If a book costs $25 and is discounted by 10%, what is the final price?', 'options': ['$22.50', '$23.50', '$24.50', '$25.50'], 'correct': '$22.50'},
-    287: {'question': 'What is the cube of 3?', 'options': ['9', '27', '81', '243'], 'correct': '27'},
-    288: {'question': 'If 4x + 8 = 24, what is the value of x?', 'options': ['4', '5', '6', '7'], 'correct': '4'},
-    289: {'question': 'What is 20% of 500?', 'options': ['50', '100', '150', '200'], 'correct': '100'},
-    290: {'question': 'If a bus travels 180 km in 3 hours, what is its speed?', 'options': ['50 km/h', '60 km/h', '70 km/h', '80 km/h'], 'correct': '60 km/h'},
-    291: {'question': 'What is the next number in the sequence: 10, 20, 30, 40, ___?', 'options': ['50', '60', '70', '80'], 'correct': '50'},
-    292: {'question': 'If a laptop costs $800 and is discounted by 15%, what is the final price?', 'options': ['$680', '$700', '$720', '$740'], 'correct': '$680'},
-    293: {'question': 'What is the square of 12?', 'options': ['144', '169', '196', '225'], 'correct': '144'},
-    294: {'question': 'If 5x - 10 = 20, what is the value of x?', 'options': ['6', '7', '8', '9'], 'correct': '6'},
-    295: {'question': 'What is 30% of 400?', 'options': ['100', '120', '140', '160'], 'correct': '120'},
-    296: {'question': 'If a train travels 360 km in 6 hours, what is its speed?', 'options': ['50 km/h', '60 km/h', '70 km/h', '80 km/h'], 'correct': '60 km/h'},
-    297: {'question': 'What is the next number in the sequence: 15, 30, 45, 60, ___?', 'options': ['75', '90', '105', '120'], 'correct': '75'},
-    298: {'question': 'If a phone costs $500 and is discounted by 25%, what is the final price?', 'options': ['$375', '$400', '$425', '$450'], 'correct': '$375'},
-    299: {'question': 'What is the cube of 4?', 'options': ['16', '64', '128', '256'], 'correct': '64'},
-    300: {'question': 'If 6x - 12 = 24, what is the value of x?', 'options': ['6', '7', '8', '9'], 'correct': '6'},
-}
-
-# Function to get 30 random questions
-def get_random_questions():
-    all_questions = list(quiz_questions.items())
-    random.shuffle(all_questions)
-    return dict(all_questions[:30])
+    user_id = int(user_id)
+    user = user_cache.get(user_id)
+    if user is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            db.session.expunge(user)
+            user_cache.set(user_id, user)
+    return user
+
+# Quiz questions are loaded lazily from QUESTION_BANK_PATH and reloaded when the file changes
+bank_loader = QuestionBankLoader(app.config['QUESTION_BANK_PATH'], app.instance_path,
+                                 app.config['QUESTION_BANK_RELOAD_INTERVAL'])
+
+def get_question_bank():
+    return bank_loader.get()
+
+def load_answer_history(user_id):
+    # Only the latest QUIZ_HISTORY_ATTEMPTS quizzes, read newest first off the (user_id, id) index,
+    # so a cache miss costs the same for a user with a long history; replayed oldest first
+    rows = db.session.execute(
+        db.select(Score.question_ids, Score.answers).where(Score.user_id == user_id, Score.answers.isnot(None))
+        .order_by(Score.id.desc()).limit(app.config['QUIZ_HISTORY_ATTEMPTS'])
+    ).all()
+    return reversed(rows)
+
+selector = None
+selector_lock = threading.Lock()
+
+def get_selector():
+    # One selector per bank version, created once per worker. Question difficulty starts
+    # out unknown and is seeded from the analytics report off the request path
+    global selector
+    question_bank = get_question_bank()
+    if selector is None or selector.question_bank is not question_bank:
+        with selector_lock:
+            if selector is None or selector.question_bank is not question_bank:
+                selector = Selector(question_bank, load_answer_history, app.config['QUIZ_HISTORY_MEMORY'],
+                                    app.config['QUIZ_HISTORY_MAX_AGE'])
+                threading.Thread(target=seed_question_stats, args=(selector,), name='question-stats',
+                                 daemon=True).start()
+    return selector
+
+def seed_question_stats(new_selector):
+    with app.app_context():
+        try:
+            report = build_question_report(new_selector.question_bank)
+        except Exception as error:
+            app.logger.error('Seeding question difficulty failed: %s', error)
+            return
+    new_selector.set_question_stats(
+        [row['asked'] for row in report['questions']],
+        [round(row['asked'] * (row['difficulty'] or 0)) for row in report['questions']])
+
+# Function to get 30 questions for a user
+def get_random_questions(user_id):
+    with metrics.timer('question_sample'):
+        if app.config['QUIZ_ADAPTIVE']:
+            return get_selector().sample(user_id, app.config['QUIZ_LENGTH'])
+        return get_question_bank().sample(app.config['QUIZ_LENGTH'], stratify=app.config['QUIZ_STRATIFIED'])
+
+# Each question's HTML never changes, so it is rendered once per bank version
+fragment_cache = FragmentCache(app.config['QUIZ_FRAGMENT_CACHE_SIZE'])
+
+def render_questions(questions, saved_answers=None):
+    # saved_answers maps str(question id) to an option index; those questions render uncached with it checked
+    version = get_question_bank().version
+    template = app.jinja_env.get_template('_question.html')
+    saved_answers = saved_answers or {}
+    with metrics.timer('question_fragments'):
+        return Markup(''.join(
+            template.render(question=question, checked=saved_answers[str(question.id)])
+            if str(question.id) in saved_answers else
+            fragment_cache.get(version, question.id, lambda question=question: template.render(question=question))
+            for question in questions
+        ))
+
+def start_attempt(user_id, questions):
+    # Drop attempts that were started but never submitted
+    cutoff = datetime.utcnow() - app.config['QUIZ_ATTEMPT_TTL']
+    QuizAttempt.query.filter(QuizAttempt.created_at < cutoff).delete()
+    now = datetime.utcnow()
+    time_limit = app.config['QUIZ_TIME_LIMIT']
+    attempt = QuizAttempt(user_id=user_id, question_ids=','.join(str(question.id) for question in questions),
+                          created_at=now, deadline=now + time_limit if time_limit else None)
+    db.session.add(attempt)
+    db.session.commit()
+    scheduler = get_deadline_scheduler()
+    if scheduler is not None and attempt.deadline is not None:
+        scheduler.schedule(attempt.id, grading_time(attempt.deadline))
+    return attempt
+
+def resume_attempt(user_id):
+    # The user's newest attempt still on the clock, so reloading the quiz neither
+    # resets the timer nor leaves a replaced attempt to be auto-graded
+    now = datetime.utcnow()
+    return QuizAttempt.query.filter(
+        QuizAttempt.user_id == user_id, attempt_is_open(),
+        QuizAttempt.created_at >= now - app.config['QUIZ_ATTEMPT_TTL'],
+        or_(QuizAttempt.deadline.is_(None), QuizAttempt.deadline >= now - app.config['QUIZ_DEADLINE_GRACE'])
+    ).order_by(QuizAttempt.id.desc()).first()
+
+def attempt_questions(attempt):
+    # Questions dropped from the bank since the attempt started are left out
+    question_bank = get_question_bank()
+    questions = [question_bank.get(question_id) for question_id in attempt.get_question_ids()]
+    return [question for question in questions if question is not None]
+
+def seconds_left(attempt):
+    if attempt.deadline is None:
+        return None
+    return max(0, int((attempt.deadline - datetime.utcnow()).total_seconds()))
+
+def pop_attempt(user_id):
+    # The attempt row itself is deleted when its score is recorded
+    return get_attempt(user_id, session.pop('attempt_id', None))
+
+def get_attempt(user_id, attempt_id):
+    attempt = db.session.get(QuizAttempt, attempt_id) if attempt_id is not None else None
+    if attempt is None or attempt.user_id != user_id or attempt.status == 'graded':
+        return None
+    if attempt.is_expired():
+        db.session.delete(attempt)
+        db.session.commit()
+        return None
+    return attempt
+
+def claim_attempt(attempt_id):
+    # Conditional update, so a submission and the deadline scheduler never both grade an attempt.
+    # It commits with the score, so an attempt whose grading fails stays open
+    result = db.session.execute(
+        db.update(QuizAttempt)
+        .where(QuizAttempt.id == attempt_id, attempt_is_open())
+        .values(status='graded')
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+def attempt_is_open():
+    return or_(QuizAttempt.status.is_(None), QuizAttempt.status == 'open')
+
+def discard_attempts(attempt_ids):
+    # Timed out with nothing saved: dropped rather than scored as 0. Only open
+    # attempts are deleted, so one a submission has just claimed still gets its score
+    db.session.execute(
+        db.delete(QuizAttempt)
+        .where(QuizAttempt.id.in_(attempt_ids), attempt_is_open())
+        .execution_options(synchronize_session=False)
+    )
+
+def grade_attempt(user_id, attempt, answers):
+    # answers maps str(question id) to the chosen option index, as the quiz form posts them
+    question_ids = attempt.get_question_ids()
+    with metrics.timer('grading'):
+        score, category_scores, answers = grade(get_question_bank(), question_ids, answers)
+    return {'id': uuid4().hex, 'user_id': user_id, 'attempt_id': attempt.id,
+            'score': score, 'category_scores': category_scores,
+            'question_ids': question_ids, 'answers': answers}
+
+def finish_attempt(user_id, attempt, answers):
+    # Returns the score, or None when the attempt was already graded
+    if not claim_attempt(attempt.id):
+        db.session.rollback()
+        return None
+    record = grade_attempt(user_id, attempt, answers)
+    written = submit_score(record)
+    # Commits the claim when the score went to the write-behind journal rather than the database
+    db.session.commit()
+    if written:
+        attempt_graded(record)
+    return record['score']
+
+def attempt_graded(record):
+    # Runs once per score, after it is in the database; journaled scores get here from flush_scores
+    if deadline_scheduler is not None:
+        deadline_scheduler.cancel(record['attempt_id'])
+    if selector is not None:
+        selector.record(record['user_id'], record['question_ids'], record['answers'])
+
+def grading_time(deadline):
+    # Deadlines are naive UTC datetimes; the scheduler works in time.time() seconds
+    return (deadline + app.config['QUIZ_DEADLINE_GRACE']).replace(tzinfo=timezone.utc).timestamp()
+
+def grade_overdue(attempt_ids):
+    # Runs on the scheduler thread: abandoned attempts are graded from their autosaved answers
+    with app.app_context():
+        try:
+            records = []
+            unanswered = []
+            for attempt in QuizAttempt.query.filter(QuizAttempt.id.in_(attempt_ids)).all():
+                saved_answers = attempt.get_saved_answers()
+                if not saved_answers:
+                    unanswered.append(attempt.id)
+                elif claim_attempt(attempt.id):
+                    records.append(grade_attempt(attempt.user_id, attempt, saved_answers))
+            discard_attempts(unanswered)
+            # One transaction for the whole batch: the claims commit with their scores
+            written = record_scores(records)
+        except Exception:
+            db.session.rollback()
+            raise
+        for record in written:
+            attempt_graded(record)
+
+deadline_scheduler = None
+deadline_scheduler_lock = threading.Lock()
+
+def get_deadline_scheduler():
+    # Started on first use in each worker and loaded with every open timed attempt,
+    # so attempts outlive restarts; claim_attempt makes duplicate scheduling harmless.
+    # The lock keeps concurrent first requests from each starting a scheduler
+    global deadline_scheduler
+    if deadline_scheduler is None and app.config['QUIZ_TIME_LIMIT']:
+        with deadline_scheduler_lock:
+            if deadline_scheduler is None:
+                scheduler = DeadlineScheduler(
+                    grade_overdue,
+                    on_error=lambda error: app.logger.error('Grading overdue attempts failed, will retry: %s', error))
+                open_attempts = db.session.execute(
+                    db.select(QuizAttempt.id, QuizAttempt.deadline)
+                    .where(QuizAttempt.deadline.isnot(None), attempt_is_open())
+                )
+                for attempt_id, deadline in open_attempts:
+                    scheduler.schedule(attempt_id, grading_time(deadline))
+                scheduler.start()
+                atexit.register(scheduler.close)
+                deadline_scheduler = scheduler
+    return deadline_scheduler
+
+@app.before_request
+def start_deadline_scheduler():
+    get_deadline_scheduler()
+
+def get_score_page(user_id, before=None):
+    # Keyset pagination, newest first: the (user_id, id) index serves every page equally fast
+    page_size = app.config['RESULTS_PAGE_SIZE']
+    query = Score.query.filter_by(user_id=user_id)
+    if before is not None:
+        query = query.filter(Score.id < before)
+    scores = query.order_by(Score.id.desc()).limit(page_size + 1).all()
+    next_before = scores[page_size - 1].id if len(scores) > page_size else None
+    return scores[:page_size], next_before
+
+def get_score_stats(user_id):
+    attempts, best, average = db.session.query(
+        func.count(Score.id), func.max(Score.score), func.avg(Score.score)
+    ).filter(Score.user_id == user_id).one()
+    window = app.config['RESULTS_TREND_WINDOW']
+    recent = db.session.query(
+        Score.score, func.row_number().over(order_by=Score.id.desc()).label('position')
+    ).filter(Score.user_id == user_id).order_by(Score.id.desc()).limit(2 * window).subquery()
+    recent_average, previous_average = db.session.query(
+        func.avg(case((recent.c.position <= window, recent.c.score))),
+        func.avg(case((recent.c.position > window, recent.c.score))),
+    ).one()
+    trend = None
+    if recent_average is not None and previous_average is not None:
+        trend = recent_average - previous_average
+    return {'attempts': attempts, 'best': best, 'average': average,
+            'recent_average': recent_average, 'trend': trend}
+
+OVERALL = ''
+
+def rank_order():
+    return (LeaderboardEntry.best_score.desc(), LeaderboardEntry.total_score.desc(), LeaderboardEntry.user_id)
+
+def load_leaderboard_entries(category):
+    # Also runs on the cache's rebuild thread, so it brings its own app context
+    with app.app_context():
+        return db.session.query(
+            LeaderboardEntry.user_id, LeaderboardEntry.best_score, LeaderboardEntry.total_score
+        ).filter_by(category=category).all()
+
+def load_leaderboard_top(category, limit):
+    entries = LeaderboardEntry.query.filter_by(category=category).order_by(*rank_order()).limit(limit).all()
+    return [{'username': entry.user.username, 'best_score': entry.best_score,
+             'total_score': entry.total_score, 'attempts': entry.attempts} for entry in entries]
+
+leaderboard_cache = Leaderboard(load_leaderboard_entries, load_leaderboard_top,
+                                app.config['LEADERBOARD_SIZE'], app.config['LEADERBOARD_REFRESH_INTERVAL'])
+
+def record_scores(records):
+    # Scores, their leaderboard summaries and the finished attempts are written in one transaction.
+    # Returns the records actually written; replayed submissions already in the database are skipped
+    submission_ids = [record['id'] for record in records]
+    seen = set(db.session.scalars(db.select(Score.submission_id).where(Score.submission_id.in_(submission_ids))))
+    totals = {}
+    attempt_ids = []
+    written = []
+    for record in records:
+        if record['id'] in seen:
+            continue
+        seen.add(record['id'])
+        written.append(record)
+        if record.get('attempt_id') is not None:
+            attempt_ids.append(record['attempt_id'])
+        question_ids, answers = pack_answers(record.get('question_ids', []), record.get('answers', []))
+        db.session.add(Score(score=record['score'], user_id=record['user_id'], submission_id=record['id'],
+                             question_ids=question_ids, answers=answers))
+        for category, points in [(OVERALL, record['score'])] + sorted(record['category_scores'].items()):
+            best, total, attempts = totals.get((category, record['user_id']), (points, 0, 0))
+            totals[(category, record['user_id'])] = (max(best, points), total + points, attempts + 1)
+    if attempt_ids:
+        QuizAttempt.query.filter(QuizAttempt.id.in_(attempt_ids)).delete()
+    changes = []
+    if totals:
+        # One query for the summaries as they were, which the rank cache needs to move entries
+        user_ids = {user_id for _, user_id in totals}
+        entries = {(category, user_id): (best, total) for category, user_id, best, total in db.session.execute(
+            db.select(LeaderboardEntry.category, LeaderboardEntry.user_id,
+                      LeaderboardEntry.best_score, LeaderboardEntry.total_score)
+            .where(LeaderboardEntry.user_id.in_(user_ids))
+        )}
+        # The increments run in the database, so concurrent workers never lose one and two
+        # first scores for a user cannot collide; key order keeps PostgreSQL row locks deadlock-free
+        insert = upsert(db.engine, LeaderboardEntry.__table__)
+        statement = insert.on_conflict_do_update(
+            index_elements=['category', 'user_id'],
+            set_={'best_score': case((insert.excluded.best_score > LeaderboardEntry.best_score,
+                                      insert.excluded.best_score), else_=LeaderboardEntry.best_score),
+                  'total_score': LeaderboardEntry.total_score + insert.excluded.total_score,
+                  'attempts': LeaderboardEntry.attempts + insert.excluded.attempts},
+        ).returning(LeaderboardEntry.category, LeaderboardEntry.user_id,
+                    LeaderboardEntry.best_score, LeaderboardEntry.total_score)
+        rows = [{'category': category, 'user_id': user_id, 'best_score': best, 'total_score': total,
+                 'attempts': attempts} for (category, user_id), (best, total, attempts) in sorted(totals.items())]
+        for category, user_id, best, total in db.session.execute(statement, rows):
+            changes.append((category, user_id, entries.get((category, user_id)), (best, total)))
+    db.session.commit()
+    for category, user_id, old, new in changes:
+        leaderboard_cache.record(category, user_id, old, new)
+    return written
+
+def flush_scores(records):
+    with app.app_context():
+        try:
+            written = record_scores(records)
+        except Exception:
+            db.session.rollback()
+            raise
+        for record in written:
+            attempt_graded(record)
+
+score_writer = None
+score_writer_lock = threading.Lock()
+
+def get_score_writer():
+    # Started on first use so forking servers start it in each worker; the lock keeps
+    # concurrent first requests from each claiming a journal slot
+    global score_writer
+    if score_writer is None and app.config['SCORE_WRITE_BEHIND']:
+        with score_writer_lock:
+            if score_writer is None:
+                journal_path, journal_lock = claim_journal(app.instance_path)
+                writer = ScoreWriter(flush_scores, journal_path, app.config['SCORE_BATCH_SIZE'],
+                                     app.config['SCORE_FLUSH_INTERVAL'], app.config['SCORE_MAX_PENDING'],
+                                     app.config['SCORE_JOURNAL_FSYNC'],
+                                     on_error=lambda error: app.logger.error('Score batch failed, will retry: %s', error))
+                writer.journal_lock = journal_lock
+                writer.start()
+                atexit.register(writer.close)
+                score_writer = writer
+    return score_writer
+
+def submit_score(record):
+    # True when the score was written directly, False when it was journaled for a later batch
+    writer = get_score_writer()
+    if writer is None or not writer.submit(record):
+        record_scores([record])
+        return True
+    return False
+
+def get_pending_scores(user_id):
+    # Read through scores that are graded but not yet written
+    writer = get_score_writer()
+    return writer.pending_for(user_id) if writer is not None else []
+
+def merge_pending_stats(stats, pending):
+    # Fold scores still waiting in the write-behind buffer into the summary
+    if not pending:
+        return stats
+    points = [record['score'] for record in pending]
+    attempts = stats['attempts'] + len(points)
+    stats = dict(stats, attempts=attempts, best=max([stats['best'] or 0] + points))
+    stats['average'] = ((stats['average'] or 0) * (attempts - len(points)) + sum(points)) / attempts
+    return stats
+
+question_report_cache = TTLCache(app.config['QUESTION_REPORT_TTL'], max_size=1)
+
+def build_question_report(question_bank=None):
+    import analytics  # NumPy is only needed for the report
+
+    if question_bank is None:
+        question_bank = get_question_bank()
+    report = question_report_cache.get(question_bank.version)
+    if report is None:
+        rows = db.session.execute(
+            db.select(Score.question_ids, Score.answers).where(Score.answers.isnot(None))
+        ).yield_per(10000)
+        report = analytics.analyze(question_bank, *analytics.load_answers(rows))
+        question_report_cache.set(question_bank.version, report)
+    return report
+
+def make_rate_limiter(name, limit):
+    if limit is None:
+        return None
+    burst, period = limit
+    if app.config['RATE_LIMIT_STORAGE']:
+        return SQLiteRateLimiter(app.config['RATE_LIMIT_STORAGE'], name, burst, period)
+    return MemoryRateLimiter(burst, period, app.config['RATE_LIMIT_MAX_KEYS'])
+
+ip_limiter = make_rate_limiter('ip', app.config['RATE_LIMIT_IP'])
+account_limiter = make_rate_limiter('account', app.config['RATE_LIMIT_ACCOUNT'])
+
+def rate_limited(email=None):
+    # Seconds the client must wait, or 0; runs before any password is hashed
+    retry_after = ip_limiter.take(request.remote_addr) if ip_limiter is not None else 0
+    if not retry_after and email is not None and account_limiter is not None:
+        retry_after = account_limiter.take(email.strip().lower())
+    return retry_after
+
+def login_succeeded(email):
+    # Hands back the tokens rate_limited took, so a cohort logging in from one address
+    # is not throttled and correct logins never count towards an account's limit
+    if ip_limiter is not None:
+        ip_limiter.refund(request.remote_addr)
+    if account_limiter is not None:
+        account_limiter.refund(email.strip().lower())
+
+def too_many_requests(retry_after, response):
+    response = app.make_response(response)
+    response.status_code = 429
+    response.headers['Retry-After'] = str(max(1, round(retry_after)))
+    return response
+
+def authenticate(email, password):
+    user = User.query.filter_by(email=email).first()
+    if user is None or not user.check_password(password):
+        return None
+    if user.needs_rehash():
+        user.set_password(password)
+        db.session.commit()
+    return user
 
 # Routes
 @app.route('/')
@@ -369,10 +644,13 @@ def index():
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
-        email = request.form['email']
-        password = request.form['password']
-        user = User.query.filter_by(email=email).first()
-        if user and user.check_password(password):
+        retry_after = rate_limited(request.form['email'])
+        if retry_after:
+            flash('Too many attempts, please try again later')
+            return too_many_requests(retry_after, render_template('login.html'))
+        user = authenticate(request.form['email'], request.form['password'])
+        if user is not None:
+            login_succeeded(request.form['email'])
             login_user(user)
             return redirect(url_for('quiz'))
         else:
@@ -382,6 +660,10 @@ def login():
 @app.route('/register', methods=['GET', 'POST'])
 def register():
     if request.method == 'POST':
+        retry_after = rate_limited()
+        if retry_after:
+            flash('Too many attempts, please try again later')
+            return too_many_requests(retry_after, render_template('register.html'))
         username = request.form['username']
         email = request.form['email']
         password = request.form['password']
@@ -401,33 +683,237 @@ def register():
 @login_required
 def quiz():
     if request.method == 'POST':
-        score = 0
-        for question_id, question_data in session.get('current_quiz', {}).items():
-            user_answer = request.form.get(str(question_id))
-            if user_answer == question_data['correct']:
-                score += 1
-        new_score = Score(score=score, user_id=current_user.id)
-        db.session.add(new_score)
-        db.session.commit()
+        attempt = pop_attempt(current_user.id)
+        if attempt is None:
+            db.session.commit()
+            flash('Your quiz has expired, please try again')
+            return redirect(url_for('quiz'))
+        if attempt.is_overdue():
+            # Past the deadline only the answers autosaved in time count
+            saved_answers = attempt.get_saved_answers()
+            if not saved_answers:
+                discard_attempts([attempt.id])
+                db.session.commit()
+                flash('Time was up before any answers were saved, so the quiz was not scored')
+                return redirect(url_for('quiz'))
+            score = finish_attempt(current_user.id, attempt, saved_answers)
+            flash('Time was up, so your saved answers were graded')
+        else:
+            score = finish_attempt(current_user.id, attempt, request.form)
+        if score is None:
+            flash('This quiz was already graded')
         return redirect(url_for('results'))
-    # Get 30 random questions and store them in the session
-    session['current_quiz'] = get_random_questions()
-    return render_template('quiz.html', questions=session['current_quiz'])
+    # An attempt still on the clock is picked up again with its saved answers;
+    # otherwise get 30 random questions. Only the attempt id is kept in the session
+    attempt = resume_attempt(current_user.id)
+    if attempt is not None:
+        questions = attempt_questions(attempt)
+        saved_answers = attempt.get_saved_answers()
+    else:
+        questions = get_random_questions(current_user.id)
+        attempt = start_attempt(current_user.id, questions)
+        saved_answers = {}
+    session['attempt_id'] = attempt.id
+    return render_template('quiz.html', questions_html=render_questions(questions, saved_answers),
+                           seconds_left=seconds_left(attempt), autosave_interval=app.config['QUIZ_AUTOSAVE_INTERVAL'])
+
+@app.route('/quiz/autosave', methods=['POST'])
+@login_required
+def quiz_autosave():
+    # Answer changes batched by the quiz page; the body is shaped like the quiz form
+    attempt = get_attempt(current_user.id, session.get('attempt_id'))
+    if attempt is None or attempt.is_overdue():
+        return '', 409
+    attempt.save_answers(request.form)
+    db.session.commit()
+    return '', 204
 
 @app.route('/results')
 @login_required
 def results():
-    scores = Score.query.filter_by(user_id=current_user.id).all()
-    return render_template('results.html', scores=scores)
+    before = request.args.get('before', type=int)
+    scores, next_before = get_score_page(current_user.id, before)
+    stats = get_score_stats(current_user.id)
+    pending = get_pending_scores(current_user.id)
+    stats = merge_pending_stats(stats, pending)
+    return render_template('results.html', scores=scores, stats=stats, before=before, next_before=next_before,
+                           pending=pending if before is None else [], quiz_length=app.config['QUIZ_LENGTH'])
+
+@app.route('/leaderboard')
+@login_required
+def leaderboard():
+    categories = sorted(get_question_bank().categories)
+    category = request.args.get('category', OVERALL)
+    if category != OVERALL and category not in categories:
+        category = OVERALL
+    entry = db.session.get(LeaderboardEntry, (category, current_user.id))
+    rank = None
+    if entry is not None:
+        rank = leaderboard_cache.rank(category, current_user.id, entry.best_score, entry.total_score)
+    return render_template('leaderboard.html', categories=categories, category=category,
+                           top=leaderboard_cache.top(category), entry=entry, rank=rank,
+                           ranked=leaderboard_cache.size(category))
+
+@app.route('/admin/questions')
+@login_required
+def question_report():
+    if current_user.email not in app.config['ADMIN_EMAILS']:
+        abort(403)
+    report = build_question_report()
+    order = request.args.get('sort', 'difficulty')
+    if order not in ('difficulty', 'discrimination', 'asked'):
+        order = 'difficulty'
+    questions = sorted(report['questions'], key=lambda row: (row[order] is None, row[order] if row[order] is not None else 0))
+    return render_template('question_report.html', report=report, questions=questions, order=order)
 
 @app.route('/logout')
 @login_required
 def logout():
+    user_cache.pop(current_user.id)
     logout_user()
     return redirect(url_for('index'))
 
-if __name__ == '__main__':
+# JSON API: questions travel as bank ids and answers as option indices;
+# a question's text and options are fetched once per bank version and cached by the client
+@app.route('/api/v1/session', methods=['POST'])
+def api_login():
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        payload = {}
+    retry_after = rate_limited(str(payload.get('email', '')))
+    if retry_after:
+        return too_many_requests(retry_after, api_error('too many attempts', 429))
+    user = authenticate(str(payload.get('email', '')), str(payload.get('password', '')))
+    if user is None:
+        return api_error('invalid email or password', 401)
+    login_succeeded(str(payload.get('email', '')))
+    login_user(user)
+    return jsonify(id=user.id, username=user.username)
+
+@app.route('/api/v1/session', methods=['DELETE'])
+@login_required
+def api_logout():
+    user_cache.pop(current_user.id)
+    logout_user()
+    return '', 204
+
+@app.route('/api/v1/attempts', methods=['POST'])
+@login_required
+def api_start_attempt():
+    # An attempt still on the clock is returned again (200) with its saved answers instead of starting another
+    attempt = resume_attempt(current_user.id)
+    if attempt is not None:
+        question_ids, status = attempt.get_question_ids(), 200
+    else:
+        questions = get_random_questions(current_user.id)
+        attempt = start_attempt(current_user.id, questions)
+        question_ids, status = [question.id for question in questions], 201
+    expires_at = attempt.deadline or attempt.created_at + app.config['QUIZ_ATTEMPT_TTL']
+    return jsonify(id=attempt.id, bank=get_question_bank().version, expires_at=expires_at.isoformat() + 'Z',
+                   timed=attempt.deadline is not None, questions=question_ids,
+                   answers=attempt.get_saved_answers()), status
+
+@app.route('/api/v1/questions')
+@login_required
+def api_questions():
+    question_bank = get_question_bank()
+    try:
+        question_ids = [int(question_id) for question_id in request.args.get('ids', '').split(',') if question_id]
+    except ValueError:
+        return api_error('ids must be comma-separated integers', 400)
+    if not 0 < len(question_ids) <= app.config['API_MAX_QUESTIONS']:
+        return api_error(f'between 1 and {app.config["API_MAX_QUESTIONS"]} ids are required', 400)
+    missing = [question_id for question_id in question_ids if question_id not in question_bank]
+    if missing:
+        return api_error('unknown question ids', 404, missing=missing)
+    # The validator is known before the body is built, so revalidation costs no serialization
+    etag = hashlib.sha1(f'{question_bank.version}:{",".join(map(str, question_ids))}'.encode()).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        questions = [question_bank.get(question_id) for question_id in question_ids]
+        response = jsonify(bank=question_bank.version, questions=[
+            {'id': question.id, 'category': question.category, 'text': question.text,
+             'options': list(question.options)} for question in questions
+        ])
+    response.set_etag(etag)
+    response.cache_control.private = True
+    if request.args.get('bank') == question_bank.version:
+        # Content named by its bank version never changes
+        response.cache_control.max_age = app.config['API_QUESTIONS_MAX_AGE']
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+@app.route('/api/v1/attempts/<int:attempt_id>/answers', methods=['POST'])
+@login_required
+def api_submit_answers(attempt_id):
+    attempt = get_attempt(current_user.id, attempt_id)
+    if attempt is None:
+        return api_error('attempt not found or expired', 404)
+    payload = request.get_json(silent=True) or {}
+    answers = payload.get('answers') if isinstance(payload, dict) else None
+    question_ids = attempt.get_question_ids()
+    # One option index per question in attempt order, -1 for unanswered
+    if not isinstance(answers, list) or len(answers) != len(question_ids):
+        return api_error(f'answers must list {len(question_ids)} option indices', 400)
+    timed_out = attempt.is_overdue()
+    # Past the deadline only the answers autosaved in time count
+    answers = attempt.get_saved_answers() if timed_out else dict(zip(map(str, question_ids), answers))
+    if timed_out and not answers:
+        discard_attempts([attempt.id])
+        db.session.commit()
+        return api_error('deadline passed with no saved answers, attempt discarded', 409)
+    score = finish_attempt(current_user.id, attempt, answers)
+    if score is None:
+        return api_error('attempt already graded', 409)
+    return jsonify(score=score, total=len(question_ids), timed_out=timed_out)
+
+@app.route('/api/v1/attempts/<int:attempt_id>/answers', methods=['PATCH'])
+@login_required
+def api_save_answers(attempt_id):
+    attempt = get_attempt(current_user.id, attempt_id)
+    if attempt is None:
+        return api_error('attempt not found or expired', 404)
+    if attempt.is_overdue():
+        return api_error('deadline has passed', 409)
+    payload = request.get_json(silent=True) or {}
+    answers = payload.get('answers') if isinstance(payload, dict) else None
+    # Changed answers only, as {question id: option index}; -1 clears an answer
+    if not isinstance(answers, dict):
+        return api_error('answers must map question ids to option indices', 400)
+    attempt.save_answers({str(question_id): answer for question_id, answer in answers.items()})
+    db.session.commit()
+    return '', 204
+
+@app.route('/api/v1/scores')
+@login_required
+def api_scores():
+    before = request.args.get('before', type=int)
+    scores, next_before = get_score_page(current_user.id, before)
+    pending = get_pending_scores(current_user.id)
+    stats = merge_pending_stats(get_score_stats(current_user.id), pending)
+    # Averages come back as Decimal from some databases
+    for name in ('average', 'recent_average', 'trend'):
+        if stats[name] is not None:
+            stats[name] = float(stats[name])
+    # Scores are [id, score] pairs, newest first; pending ones have no id yet
+    return jsonify(scores=[[score.id, score.score] for score in scores], next=next_before, stats=stats,
+                   pending=[record['score'] for record in reversed(pending)] if before is None else [])
+
+if app.config['COMPRESS_ENABLED']:
+    init_compression(app, app.config['COMPRESS_MIN_SIZE'], app.config['COMPRESS_LEVEL'])
+
+if app.config['METRICS_ENABLED']:
     with app.app_context():
-        # Create all database tables
-        db.create_all()
+        metrics.init_metrics(app, db.engine, app.config['PROFILER_SAMPLE_RATE'], app.config['PROFILER_DIR'])
+
+@app.cli.command('init-db')
+def init_db():
+    """Create missing database tables and indexes."""
+    create_missing(db)
+    print('Database initialized.')
+
+if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
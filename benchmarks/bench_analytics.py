@@ -0,0 +1,58 @@
+# Time the question analytics over synthetic stored answers
+# Run from the project root: python benchmarks/bench_analytics.py [--attempts N]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import analytics
+from question_bank import load_question_bank
+
+QUIZ_LENGTH = 30
+
+
+def make_rows(question_bank, attempts, seed=42):
+    # Each simulated user has an ability; each question a difficulty
+    rng = np.random.default_rng(seed)
+    ids = np.array([question.id for question in question_bank.questions], dtype=np.uint32)
+    key = np.array([question.answer for question in question_bank.questions], dtype=np.int8)
+    ease = rng.uniform(0.2, 0.9, len(ids))
+    ability = rng.normal(0, 0.15, attempts)
+    rows = []
+    for attempt in range(attempts):
+        positions = rng.choice(len(ids), QUIZ_LENGTH, replace=False)
+        correct = rng.random(QUIZ_LENGTH) < np.clip(ease[positions] + ability[attempt], 0, 1)
+        wrong = (key[positions] + rng.integers(1, 4, QUIZ_LENGTH)) % 4
+        answers = np.where(correct, key[positions], wrong).astype(np.int8)
+        answers[rng.random(QUIZ_LENGTH) < 0.02] = -1
+        rows.append((ids[positions].tobytes(), answers.tobytes()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--attempts', type=int, default=100_000)
+    args = parser.parse_args()
+
+    question_bank = load_question_bank(os.path.join(ROOT, 'questions.jsonl'))
+    rows = make_rows(question_bank, args.attempts)
+    started = time.perf_counter()
+    arrays = analytics.load_answers(rows)
+    loaded = time.perf_counter()
+    report = analytics.analyze(question_bank, *arrays)
+    finished = time.perf_counter()
+    print(f'{report["answers"]} answers from {report["attempts"]} attempts')
+    print(f'unpack:  {(loaded - started) * 1000:8.1f} ms')
+    print(f'analyze: {(finished - loaded) * 1000:8.1f} ms')
+    hardest = min((row for row in report['questions'] if row['asked']), key=lambda row: row['difficulty'])
+    print(f'hardest question {hardest["question"].id}: difficulty {hardest["difficulty"]:.2f}, '
+          f'discrimination {hardest["discrimination"]:+.2f}, options {hardest["options"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# Compare bytes on the wire and server CPU per quiz for the HTML pages and the JSON API
+# Run from the project root: python benchmarks/bench_api.py [--quizzes N]
+import argparse
+import gzip
+import json
+import re
+import sys
+import time
+from urllib.parse import urlencode
+
+from common import PASSWORD, scratch_app, seed
+import compression
+
+ENCODINGS = {'identity': {}, 'gzip': {'Accept-Encoding': 'gzip'}, 'br': {'Accept-Encoding': 'br, gzip'}}
+
+
+class Meter:
+    # Totals request and response body bytes and process CPU time per step
+    def __init__(self, client, headers):
+        self.client = client
+        self.headers = headers
+        self.steps = {}
+
+    def call(self, step, method, path, headers=None, **kwargs):
+        started = time.process_time()
+        response = self.client.open(path, method=method, headers={**self.headers, **(headers or {})}, **kwargs)
+        cpu = time.process_time() - started
+        assert response.status_code in (200, 201, 302, 304), (step, response.status_code)
+        sent = len(kwargs.get('data') or '') + len(json.dumps(kwargs['json']) if 'json' in kwargs else '')
+        totals = self.steps.setdefault(step, [0, 0, 0.0, 0])
+        totals[0] += sent
+        totals[1] += len(response.data)
+        totals[2] += cpu
+        totals[3] += 1
+        return response
+
+
+def html_quiz(meter):
+    page = meter.call('quiz_page', 'GET', '/quiz')
+    # The test client hands back the body as sent
+    html = page.data
+    if page.headers.get('Content-Encoding') == 'gzip':
+        html = gzip.decompress(html)
+    elif page.headers.get('Content-Encoding') == 'br':
+        html = compression.brotli.decompress(html)
+    answers = dict(re.findall(r'name="(\d+)" value="([^"]*)"', html.decode()))
+    meter.call('quiz_submit', 'POST', '/quiz', data=urlencode(answers),
+               content_type='application/x-www-form-urlencoded')
+    meter.call('results', 'GET', '/results')
+
+
+def api_quiz(meter, cached_questions):
+    attempt = meter.call('attempt', 'POST', '/api/v1/attempts').json
+    # A client with a warm cache only fetches questions it has not seen under this bank version
+    unseen = [question_id for question_id in attempt['questions'] if question_id not in cached_questions]
+    if unseen:
+        meter.call('questions', 'GET', f'/api/v1/questions?bank={attempt["bank"]}&ids={",".join(map(str, unseen))}')
+        cached_questions.update(unseen)
+    meter.call('answers', 'POST', f'/api/v1/attempts/{attempt["id"]}/answers',
+               json={'answers': [index % 4 for index in range(len(attempt['questions']))]})
+    meter.call('scores', 'GET', '/api/v1/scores')
+
+
+def report(name, meter, quizzes):
+    print(f'{name}')
+    total_sent = total_received = total_cpu = 0
+    for step, (sent, received, cpu, count) in meter.steps.items():
+        print(f'  {step:<14}{count:>7}{sent / count:>12.0f}{received / count:>12.0f}{cpu / count * 1000:>10.2f}')
+        total_sent += sent
+        total_received += received
+        total_cpu += cpu
+    print(f'  {"per quiz":<14}{"":>7}{total_sent / quizzes:>12.0f}{total_received / quizzes:>12.0f}'
+          f'{total_cpu / quizzes * 1000:>10.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--quizzes', type=int, default=200)
+    parser.add_argument('--scores-per-user', type=int, default=50, help='history shown on the results pages')
+    args = parser.parse_args()
+
+    quiz_app = scratch_app(hash_method='pbkdf2:sha256:1000')
+    seed(quiz_app, 1, args.scores_per_user)
+    app = quiz_app.app
+    print(f'{"step":<16}{"count":>7}{"sent B":>12}{"recv B":>12}{"cpu ms":>10}')
+    for encoding, headers in ENCODINGS.items():
+        if encoding == 'br' and compression.brotli is None:
+            print('brotli is not installed, skipping br')
+            continue
+        cached_questions = set()
+        runs = {
+            'html': html_quiz,
+            'api (cold)': lambda meter: api_quiz(meter, set()),
+            'api (cached)': lambda meter: api_quiz(meter, cached_questions),
+        }
+        for name, run in runs.items():
+            client = app.test_client()
+            client.post('/login', data={'email': 'user1@example.com', 'password': PASSWORD})
+            run(Meter(client, headers))  # Warm-up fills the caches
+            meter = Meter(client, headers)
+            for _ in range(args.quizzes):
+                run(meter)
+            report(f'{name}, {encoding}', meter, args.quizzes)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# Time authenticated requests with and without the user cache, and login
+# throughput under concurrent clients for a few password hashing policies.
+# Run from the project root: python benchmarks/bench_auth.py [--threads N]
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+POLICIES = ['scrypt:32768:8:1', 'scrypt:16384:8:1', 'pbkdf2:sha256:600000', 'pbkdf2:sha256:100000']
+
+
+def per_request_us(client, url, number):
+    started = time.perf_counter()
+    for _ in range(number):
+        client.get(url)
+    return (time.perf_counter() - started) / number * 1e6
+
+
+def login_throughput(app, threads, logins_per_thread):
+    def worker(_):
+        client = app.test_client()
+        for _ in range(logins_per_thread):
+            response = client.post('/login', data={'email': 'bench@example.com', 'password': 'password'})
+            assert response.status_code == 302, response.status_code
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(worker, range(threads)))
+    return threads * logins_per_thread / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 4)
+    parser.add_argument('--logins', type=int, default=5, help='logins per thread')
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    import app as quiz_app
+    app = quiz_app.app
+    quiz_app.ip_limiter = quiz_app.account_limiter = None  # Every client logs in from one address
+    with app.app_context():
+        quiz_app.db.create_all()
+        user = quiz_app.User(username='bench', email='bench@example.com')
+        user.set_password('password')
+        quiz_app.db.session.add(user)
+        quiz_app.db.session.commit()
+
+    client = app.test_client()
+    client.post('/login', data={'email': 'bench@example.com', 'password': 'password'})
+    cache_ttl = quiz_app.user_cache.ttl
+    for label, ttl in (('no user cache', 0), ('user cache', cache_ttl)):
+        quiz_app.user_cache.ttl = ttl
+        quiz_app.user_cache.clear()
+        print(f'GET / authenticated, {label:>13}: {per_request_us(client, "/", args.requests):7.1f} us/request')
+
+    for method in POLICIES:
+        app.config['PASSWORD_HASH_METHOD'] = method
+        # The first login rehashes the stored password to the new policy
+        app.test_client().post('/login', data={'email': 'bench@example.com', 'password': 'password'})
+        rate = login_throughput(app, args.threads, args.logins)
+        print(f'login {method:>22}, {args.threads} threads: {rate:7.1f} logins/s')
+
+
+if __name__ == '__main__':
+    main()
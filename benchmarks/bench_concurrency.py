@@ -0,0 +1,139 @@
+# Hold slow client connections open against each serving mode of serve.py and
+# measure throughput and latency for normal clients alongside them.
+# Each slow client sends its headers, then trickles the request body a byte at a time.
+# Run from the project root: python benchmarks/bench_concurrency.py [--held 0,16,64,256] [--modes wsgi,asgi]
+import argparse
+import http.client
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from common import PASSWORD, ROOT, scratch_app, seed, summarize
+
+SERVERS = {'wsgi': 'gunicorn', 'asgi': 'uvicorn'}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit(f'server on port {port} did not start')
+
+
+def hold(port, count, stop):
+    # Slow submissions: a complete header block and a body that never finishes arriving
+    sockets = []
+    for _ in range(count):
+        sock = socket.create_connection(('127.0.0.1', port))
+        sock.sendall(b'POST /api/v1/session HTTP/1.1\r\nHost: localhost\r\n'
+                     b'Content-Type: application/json\r\nContent-Length: 100000\r\n\r\n{')
+        sockets.append(sock)
+    while not stop.wait(1):
+        for sock in sockets:
+            try:
+                sock.send(b' ')
+            except OSError:
+                pass
+    for sock in sockets:
+        sock.close()
+
+
+def fast_client(port, number, deadline, samples, errors):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    try:
+        connection.request('POST', '/api/v1/session', body=json.dumps(
+            {'email': f'user{number}@example.com', 'password': PASSWORD}), headers={'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        response.read()
+        cookie = response.getheader('Set-Cookie').split(';', 1)[0]
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            connection.request('GET', '/api/v1/scores', headers={'Cookie': cookie})
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+            samples.append(time.perf_counter() - started)
+    except (OSError, http.client.HTTPException, AttributeError) as error:
+        errors.append(type(error).__name__)
+    finally:
+        connection.close()
+
+
+def measure(port, held, clients, duration):
+    stop = threading.Event()
+    holder = threading.Thread(target=hold, args=(port, held, stop))
+    holder.start()
+    time.sleep(1)  # Let the held connections reach the server first
+    samples = []
+    errors = []
+    deadline = time.monotonic() + duration
+    threads = [threading.Thread(target=fast_client, args=(port, number + 1, deadline, samples, errors))
+               for number in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    holder.join()
+    return summarize(samples, elapsed), errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modes', default='wsgi,asgi')
+    parser.add_argument('--held', default='0,16,64,256', help='comma-separated slow connection counts')
+    parser.add_argument('--clients', type=int, default=8, help='concurrent normal clients')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per measurement')
+    parser.add_argument('--workers', type=int, default=1, help='server worker processes, the same for each mode')
+    parser.add_argument('--threads', type=int, default=8, help='request threads per worker')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    quiz_app = scratch_app(workdir, hash_method='pbkdf2:sha256:1000')
+    seed(quiz_app, args.clients, 20)
+    env = dict(os.environ, DATABASE_URL=quiz_app.app.config['SQLALCHEMY_DATABASE_URI'])
+
+    print(f'{"mode":<6}{"held":>6}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"errors":>8}')
+    for mode in args.modes.split(','):
+        if importlib.util.find_spec(SERVERS[mode]) is None:
+            print(f'{mode}: {SERVERS[mode]} is not installed, skipping')
+            continue
+        port = free_port()
+        server = subprocess.Popen([sys.executable, 'serve.py', '--mode', mode, '--bind', f'127.0.0.1:{port}',
+                                   '--workers', str(args.workers), '--threads', str(args.threads)],
+                                  cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for(port)
+            measure(port, 0, args.clients, 1)  # Warm-up: logins upgrade the seeded password hashes
+            for held in [int(count) for count in args.held.split(',')]:
+                stats, errors = measure(port, held, args.clients, args.duration)
+                if not stats['count']:
+                    stats = dict(stats, rps=0, p50_ms=float('nan'), p95_ms=float('nan'))
+                print(f'{mode:<6}{held:>6}{stats["rps"]:>10}{stats["p50_ms"]:>10.2f}{stats["p95_ms"]:>10.2f}'
+                      f'{len(errors):>8}')
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
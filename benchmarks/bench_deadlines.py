@@ -0,0 +1,110 @@
+# Measure the deadline scheduler with many in-progress timed attempts: memory, threads and
+# how late deadlines fire, then auto-grade abandoned attempts end to end through the app.
+# Run from the project root: python benchmarks/bench_deadlines.py [--attempts N] [--spread S]
+import argparse
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from common import scratch_app, seed
+from deadlines import DeadlineScheduler
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000 if samples else float('nan')
+
+
+def bench_scheduler(attempts, spread, submitted_share):
+    # Deadlines spread over `spread` seconds; a share of attempts is submitted (cancelled) first
+    lateness = []
+    done = threading.Event()
+    expected = attempts - int(attempts * submitted_share)
+
+    def handle(keys):
+        now = time.time()
+        lateness.extend(now - deadlines[key] for key in keys)
+        if len(lateness) >= expected:
+            done.set()
+
+    scheduler = DeadlineScheduler(handle)
+    scheduler.start()
+    rng = random.Random(42)
+    start = time.time() + 1
+    deadlines = {key: start + rng.random() * spread for key in range(attempts)}
+    tracemalloc.start()
+    started = time.perf_counter()
+    for key, deadline in deadlines.items():
+        scheduler.schedule(key, deadline)
+    scheduled = time.perf_counter() - started
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    threads = threading.active_count()
+    for key in rng.sample(range(attempts), attempts - expected):
+        scheduler.cancel(key)
+    done.wait(spread + 30)
+    scheduler.close()
+    lateness.sort()
+    print(f'scheduler: {attempts} attempts, {attempts - expected} submitted early, deadlines over {spread:.0f}s')
+    print(f'  schedule {scheduled / attempts * 1e6:.1f}us each, {memory / 2**20:.1f} MiB held, {threads} threads')
+    print(f'  fired {len(lateness)}/{expected}; late by p50 {percentile(lateness, 0.5):.2f}ms, '
+          f'p99 {percentile(lateness, 0.99):.2f}ms, max {percentile(lateness, 1.0):.2f}ms')
+
+
+def bench_grading(attempts, users):
+    # Abandoned attempts already in the database are picked up when the scheduler starts,
+    # as after a restart, and graded from their autosaved answers
+    quiz_app = scratch_app(hash_method='pbkdf2:sha256:1000')
+    seed(quiz_app, users, 0)
+    app, db, QuizAttempt = quiz_app.app, quiz_app.db, quiz_app.QuizAttempt
+    app.config['QUIZ_DEADLINE_GRACE'] = timedelta(0)
+    rng = random.Random(42)
+    with app.app_context():
+        question_bank = quiz_app.get_question_bank()
+        user_ids = db.session.scalars(db.select(quiz_app.User.id)).all()
+        deadline = datetime.utcnow() + timedelta(seconds=2)
+        rows = []
+        for _ in range(attempts):
+            questions = question_bank.sample(app.config['QUIZ_LENGTH'], rng=rng)
+            attempt = QuizAttempt(question_ids=','.join(str(question.id) for question in questions))
+            attempt.save_answers({str(question.id): rng.randrange(len(question.options)) for question in questions
+                                  if rng.random() < 0.7})
+            rows.append({'user_id': rng.choice(user_ids), 'question_ids': attempt.question_ids,
+                         'answers': attempt.answers, 'created_at': datetime.utcnow(), 'deadline': deadline,
+                         'status': 'open'})
+        db.session.execute(QuizAttempt.__table__.insert(), rows)
+        db.session.commit()
+        scheduler = quiz_app.get_deadline_scheduler()
+    loaded = len(scheduler)
+    due = quiz_app.grading_time(deadline)
+    with app.app_context():
+        while True:
+            remaining = db.session.scalar(db.select(db.func.count(QuizAttempt.id)))
+            db.session.rollback()  # End the read so the next count sees new commits
+            if not remaining:
+                break
+            time.sleep(0.01)
+        graded = db.session.scalar(db.select(db.func.count(quiz_app.Score.id)))
+    elapsed = time.time() - due
+    print(f'grading: {loaded} abandoned attempts loaded at startup, {graded} graded '
+          f'{elapsed:.2f}s after their deadline ({graded / elapsed:.0f}/s)')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--attempts', type=int, default=10_000)
+    parser.add_argument('--spread', type=float, default=10, help='seconds the scheduler deadlines are spread over')
+    parser.add_argument('--submitted', type=float, default=0.5, help='share of attempts submitted before the deadline')
+    parser.add_argument('--grade', type=int, default=2000, help='abandoned attempts to auto-grade through the app')
+    parser.add_argument('--users', type=int, default=100)
+    args = parser.parse_args()
+
+    bench_scheduler(args.attempts, args.spread, args.submitted)
+    if args.grade:
+        bench_grading(args.grade, args.users)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
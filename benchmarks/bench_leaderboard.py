@@ -0,0 +1,100 @@
+# Seed a scratch database with many scores and time /leaderboard page generation
+# Run from the project root: python benchmarks/bench_leaderboard.py [--scores N] [--users N]
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def seed(quiz_app, users, scores, categories):
+    db = quiz_app.db
+    password_hash = quiz_app.generate_password_hash('password')
+    rng = random.Random(42)
+    db.session.execute(quiz_app.User.__table__.insert(), [
+        {'id': user_id, 'username': f'user{user_id}', 'email': f'user{user_id}@example.com', 'password_hash': password_hash}
+        for user_id in range(1, users + 1)
+    ])
+    summary = {}
+    batch = []
+    for _ in range(scores):
+        user_id = rng.randint(1, users)
+        score = rng.randint(0, 30)
+        batch.append({'score': score, 'user_id': user_id})
+        per_category = [(quiz_app.OVERALL, score)] + [(category, rng.randint(0, 8)) for category in categories]
+        for category, points in per_category:
+            best, total, attempts = summary.get((category, user_id), (0, 0, 0))
+            summary[(category, user_id)] = (max(best, points), total + points, attempts + 1)
+        if len(batch) == 50_000:
+            db.session.execute(quiz_app.Score.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(quiz_app.Score.__table__.insert(), batch)
+    db.session.execute(quiz_app.LeaderboardEntry.__table__.insert(), [
+        {'category': category, 'user_id': user_id, 'best_score': best, 'total_score': total, 'attempts': attempts}
+        for (category, user_id), (best, total, attempts) in summary.items()
+    ])
+    db.session.commit()
+
+
+def timed_get(client, url, number):
+    samples = []
+    for _ in range(number):
+        started = time.perf_counter()
+        response = client.get(url)
+        samples.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.status_code
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scores', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=50_000)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    import app as quiz_app
+    app = quiz_app.app
+    with app.app_context():
+        quiz_app.db.create_all()
+        categories = sorted(quiz_app.get_question_bank().categories)
+        started = time.perf_counter()
+        seed(quiz_app, args.users, args.scores, categories)
+        print(f'seeded {args.scores} scores for {args.users} users in {time.perf_counter() - started:.1f}s')
+
+    client = app.test_client()
+    client.post('/login', data={'email': 'user1@example.com', 'password': 'password'})
+    for label, url in (('overall', '/leaderboard'), ('category', f'/leaderboard?category={categories[0]}')):
+        started = time.perf_counter()
+        client.get(url)
+        cold = (time.perf_counter() - started) * 1000
+        p50, p95 = timed_get(client, url, args.requests)
+        print(f'{label:>9}: cold {cold:7.1f} ms, p50 {p50:6.2f} ms, p95 {p95:6.2f} ms')
+
+    # A submission only moves one key in the cached rank index
+    with app.test_request_context():
+        started = time.perf_counter()
+        quiz_app.record_scores([{'id': 'bench', 'user_id': 1, 'score': 30,
+                                 'category_scores': {category: 8 for category in categories}}])
+        print(f'record_scores: {(time.perf_counter() - started) * 1000:.2f} ms')
+    p50, p95 = timed_get(client, '/leaderboard', args.requests)
+    print(f'  after write: p50 {p50:6.2f} ms, p95 {p95:6.2f} ms')
+
+    # A stale index keeps serving while its replacement is built on a background thread
+    quiz_app.leaderboard_cache.refresh_interval = 0.5
+    time.sleep(0.5)
+    p50, p95 = timed_get(client, '/leaderboard', args.requests)
+    print(f'  refreshing every 0.5s: p50 {p50:6.2f} ms, p95 {p95:6.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
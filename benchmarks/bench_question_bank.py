@@ -0,0 +1,53 @@
+# Compare the old shuffle-everything sampler with QuestionBank.sample
+# Run from the project root: python benchmarks/bench_question_bank.py
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_bank import Question, QuestionBank
+
+CATEGORIES = ['General Knowledge', 'Technology', 'Ecosystem/Biology/Environment/Health', 'Aptitude']
+QUIZ_LENGTH = 30
+
+
+def make_questions(size):
+    return {
+        question_id: {'question': f'Question {question_id}?', 'options': ['A', 'B', 'C', 'D'], 'correct': 'A'}
+        for question_id in range(1, size + 1)
+    }
+
+
+def make_bank(size):
+    return QuestionBank(
+        Question(question_id, CATEGORIES[question_id % len(CATEGORIES)], f'Question {question_id}?', ['A', 'B', 'C', 'D'], 0)
+        for question_id in range(1, size + 1)
+    )
+
+
+def shuffle_sample(quiz_questions):
+    all_questions = list(quiz_questions.items())
+    random.shuffle(all_questions)
+    return dict(all_questions[:QUIZ_LENGTH])
+
+
+def per_call_us(func, number):
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    print(f'{"bank size":>10}  {"shuffle":>12}  {"sample":>12}  {"stratified":>12}')
+    for size in (300, 10_000, 100_000, 1_000_000):
+        quiz_questions = make_questions(size)
+        bank = make_bank(size)
+        number = max(10, 300_000 // size)
+        old = per_call_us(lambda: shuffle_sample(quiz_questions), number)
+        new = per_call_us(lambda: bank.sample(QUIZ_LENGTH), 2000)
+        stratified = per_call_us(lambda: bank.sample(QUIZ_LENGTH, stratify=True), 2000)
+        print(f'{size:>10}  {old:>10.1f}us  {new:>10.1f}us  {stratified:>10.1f}us')
+
+
+if __name__ == '__main__':
+    main()
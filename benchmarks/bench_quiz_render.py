@@ -0,0 +1,52 @@
+# Compare rendering the quiz page by looping over questions in Jinja with
+# assembling it from cached per-question fragments.
+# Run from the project root: python benchmarks/bench_quiz_render.py
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import render_template
+
+import app as quiz_app
+
+# quiz.html as it was before fragment caching
+LOOP_TEMPLATE = """{% extends 'base.html' %}
+{% block content %}
+    <form method="POST">
+        {% for question in questions %}
+            <div class="mb-4">
+                <p class="fw-bold fs-5 text-start" style="color: #495057;">{{ question.text }}</p>
+                <div class="d-grid gap-2">
+                    {% for option in question.options %}
+                        <div class="form-check">
+                            <input class="form-check-input" type="radio" name="{{ question.id }}" value="{{ option }}" required>
+                            <label class="form-check-label" style="font-size: 1.1rem;">{{ option }}</label>
+                        </div>
+                    {% endfor %}
+                </div>
+            </div>
+        {% endfor %}
+    </form>
+{% endblock %}"""
+
+NUMBER = 500
+
+
+def main():
+    app = quiz_app.app
+    with app.test_request_context('/quiz'):
+        questions = quiz_app.get_random_questions()
+        loop_template = app.jinja_env.from_string(LOOP_TEMPLATE)
+        loop = min(timeit.repeat(lambda: render_template(loop_template, questions=questions), number=NUMBER, repeat=5))
+        quiz_app.fragment_cache.clear()
+        cold = min(timeit.repeat(lambda: (quiz_app.fragment_cache.clear(), render_template('quiz.html', questions_html=quiz_app.render_questions(questions))), number=NUMBER, repeat=5))
+        warm = min(timeit.repeat(lambda: render_template('quiz.html', questions_html=quiz_app.render_questions(quiz_app.get_random_questions())), number=NUMBER, repeat=5))
+    print(f'jinja loop:         {loop / NUMBER * 1e6:8.1f} us/page')
+    print(f'fragments (cold):   {cold / NUMBER * 1e6:8.1f} us/page')
+    print(f'fragments (cached): {warm / NUMBER * 1e6:8.1f} us/page')
+
+
+if __name__ == '__main__':
+    main()
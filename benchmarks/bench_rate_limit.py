@@ -0,0 +1,150 @@
+# Simulate a credential-stuffing attack on /login and measure how legitimate quiz traffic
+# holds up with and without the login rate limiter. Attackers and legitimate users connect
+# from different loopback addresses so the per-address buckets can tell them apart (Linux).
+# Run from the project root: python benchmarks/bench_rate_limit.py [--attackers N] [--duration S]
+import argparse
+import http.client
+import logging
+import multiprocessing
+import re
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+
+from common import PASSWORD, scratch_app, seed, summarize
+from loadgen import free_port
+
+SCENARIOS = [('baseline', 0, False), ('attack', None, False), ('attack, limited', None, True)]
+
+
+def serve(workdir, port, users, rate_limits, ip_limit, ready):
+    from werkzeug.serving import make_server
+
+    quiz_app = scratch_app(workdir, rate_limits=rate_limits)
+    if rate_limits and ip_limit:
+        quiz_app.ip_limiter = quiz_app.make_rate_limiter('ip', ip_limit)
+    seed(quiz_app, users, 5)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', port, quiz_app.app, threaded=True)
+    ready.set()
+    server.serve_forever()
+
+
+def connect(port, address):
+    return http.client.HTTPConnection('127.0.0.1', port, timeout=60, source_address=(address, 0))
+
+
+def request(connection, method, path, form=None, cookie=None):
+    headers = {}
+    body = None
+    if form is not None:
+        body = urlencode(form)
+        headers['Content-Type'] = 'application/x-www-form-urlencoded'
+    if cookie:
+        headers['Cookie'] = cookie
+    connection.request(method, path, body=body, headers=headers)
+    response = connection.getresponse()
+    return response, response.read().decode()
+
+
+def attack(number, port, addresses, first_user, users, deadline, results):
+    # Each attacker rotates through its own block of addresses and guesses passwords for
+    # accounts the legitimate clients do not use, so it never locks them out
+    statuses = {}
+    guess = 0
+    while time.monotonic() < deadline:
+        guess += 1
+        connection = connect(port, f'127.0.{number + 1}.{guess % addresses + 1}')
+        try:
+            response, _ = request(connection, 'POST', '/login', {
+                'email': f'user{first_user + guess % users}@example.com', 'password': f'guess{guess}'})
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+        except OSError:
+            statuses['error'] = statuses.get('error', 0) + 1
+        finally:
+            connection.close()
+    results.put(('attacker', statuses))
+
+
+def legitimate(number, port, measure_from, deadline, results):
+    # Logs in once, then takes quizzes and checks results from its own address;
+    # latency is recorded once the attack has used up its initial bursts
+    samples = {}
+    connection = connect(port, f'127.0.0.{number + 2}')
+    response, _ = request(connection, 'POST', '/login', {'email': f'user{number + 1}@example.com', 'password': PASSWORD})
+    cookie = response.getheader('Set-Cookie').split(';', 1)[0]
+    while time.monotonic() < deadline:
+        for step, method, path in (('quiz_start', 'GET', '/quiz'), ('quiz_submit', 'POST', '/quiz'),
+                                   ('results', 'GET', '/results')):
+            form = dict(re.findall(r'name="(\d+)" value="([^"]*)"', page)) if method == 'POST' else None
+            started = time.perf_counter()
+            response, page = request(connection, method, path, form, cookie)
+            if time.monotonic() >= measure_from:
+                samples.setdefault(step, []).append(time.perf_counter() - started)
+    connection.close()
+    results.put(('legitimate', samples))
+
+
+def run(scenario, args):
+    context = multiprocessing.get_context('spawn')
+    port = free_port()
+    ready = context.Event()
+    server = context.Process(target=serve, daemon=True, args=(
+        tempfile.mkdtemp(), port, args.clients + args.targets, scenario[2], args.ip_limit, ready))
+    server.start()
+    if not ready.wait(300):
+        server.terminate()
+        raise SystemExit('server did not start')
+    results = context.Queue()
+    measure_from = time.monotonic() + args.warmup
+    deadline = measure_from + args.duration
+    processes = [context.Process(target=legitimate, args=(number, port, measure_from, deadline, results))
+                 for number in range(args.clients)]
+    processes += [context.Process(target=attack, args=(number, port, args.addresses, args.clients + 1, args.targets,
+                                                        deadline, results))
+                  for number in range(args.attackers if scenario[1] is None else scenario[1])]
+    for process in processes:
+        process.start()
+    samples = {}
+    statuses = {}
+    for _ in processes:
+        kind, data = results.get()
+        if kind == 'legitimate':
+            for step, values in data.items():
+                samples.setdefault(step, []).extend(values)
+        else:
+            for status, count in data.items():
+                statuses[status] = statuses.get(status, 0) + count
+    for process in processes:
+        process.join()
+    server.terminate()
+    return samples, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--attackers', type=int, default=8, help='attacking client processes')
+    parser.add_argument('--clients', type=int, default=4, help='legitimate client processes')
+    parser.add_argument('--addresses', type=int, default=1, help='client addresses each attacker rotates through')
+    parser.add_argument('--warmup', type=float, default=20, help='seconds of attack before latency is recorded')
+    parser.add_argument('--duration', type=float, default=20, help='seconds latency is recorded for')
+    parser.add_argument('--ip-limit', type=lambda value: tuple(map(float, value.split('/'))),
+                        help='override RATE_LIMIT_IP as burst/seconds, e.g. 5/60')
+    parser.add_argument('--targets', type=int, default=100, help='accounts the attackers guess passwords for')
+    args = parser.parse_args()
+
+    print(f'{"scenario":<18}{"step":<14}{"count":>7}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}')
+    for scenario in SCENARIOS:
+        samples, statuses = run(scenario, args)
+        for step, values in samples.items():
+            stats = summarize(values, args.duration)
+            print(f'{scenario[0]:<18}{step:<14}{stats["count"]:>7}{stats["p50_ms"]:>10.2f}{stats["p95_ms"]:>10.2f}'
+                  f'{stats["p99_ms"]:>10.2f}')
+        if statuses:
+            print(f'{"":<18}attacker responses over {args.warmup + args.duration:.0f}s: '
+                  + ', '.join(f'{status}: {count}' for status, count in sorted(statuses.items(), key=str)))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+# Load test quiz submissions with direct and write-behind score writes.
+# Every thread is a separate user who starts a quiz and submits it; only
+# the submissions are timed.
+# Run from the project root: python benchmarks/bench_score_writes.py [--threads N] [--synchronous FULL]
+import argparse
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def run(quiz_app, threads, submissions):
+    app = quiz_app.app
+    barrier = threading.Barrier(threads)
+
+    def worker(number):
+        client = app.test_client()
+        client.post('/register', data={'username': f'user{number}-{time.monotonic_ns()}',
+                                       'email': f'user{number}-{time.monotonic_ns()}@example.com', 'password': 'pw'})
+        elapsed = 0
+        barrier.wait()
+        for _ in range(submissions):
+            page = client.get('/quiz').data.decode()
+            answers = dict(re.findall(r'name="(\d+)" value="([^"]*)"', page))
+            started = time.perf_counter()
+            response = client.post('/quiz', data=answers)
+            elapsed += time.perf_counter() - started
+            assert response.status_code == 302, response.status_code
+        return elapsed
+
+    with ThreadPoolExecutor(threads) as pool:
+        busy = list(pool.map(worker, range(threads)))
+    # Total time spent inside submissions across threads, spread over the threads
+    return threads * submissions / (sum(busy) / threads)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--submissions', type=int, default=25, help='submissions per thread')
+    parser.add_argument('--synchronous', default='FULL', help='SQLite synchronous pragma (FULL fsyncs every commit)')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    import app as quiz_app
+    app = quiz_app.app
+    quiz_app.ip_limiter = quiz_app.account_limiter = None  # Every client logs in from one address
+    app.config['SQLITE_PRAGMAS']['synchronous'] = args.synchronous
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'  # Registration is not what is measured
+    app.instance_path = workdir
+    with app.app_context():
+        quiz_app.create_missing(quiz_app.db)
+
+    direct = run(quiz_app, args.threads, args.submissions)
+    print(f'direct writes:      {direct:8.1f} submissions/s')
+    app.config['SCORE_WRITE_BEHIND'] = True
+    batched = run(quiz_app, args.threads, args.submissions)
+    started = time.perf_counter()
+    quiz_app.score_writer.close()
+    print(f'write-behind:       {batched:8.1f} submissions/s (final flush {time.perf_counter() - started:.2f}s)')
+    with app.app_context():
+        print(f'scores stored:      {quiz_app.Score.query.count()} of {2 * args.threads * args.submissions}')
+
+
+if __name__ == '__main__':
+    main()
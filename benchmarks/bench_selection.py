@@ -0,0 +1,78 @@
+# Time adaptive question selection for many users over a large bank within a fixed history budget
+# Run from the project root: python benchmarks/bench_selection.py [--users N] [--questions N] [--budget-mb N]
+import argparse
+import os
+import random
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grading import pack_answers
+from question_bank import Question, QuestionBank
+from selection import Selector
+
+CATEGORIES = ['General Knowledge', 'Technology', 'Ecosystem/Biology/Environment/Health', 'Aptitude']
+QUIZ_LENGTH = 30
+
+
+def make_bank(size):
+    return QuestionBank(
+        Question(question_id, CATEGORIES[question_id % len(CATEGORIES)], f'Question {question_id}?', ['A', 'B', 'C', 'D'],
+                 question_id % 4)
+        for question_id in range(1, size + 1)
+    )
+
+
+def history_loader(question_count, attempts):
+    # Stands in for the Score query: each user's past quizzes, derived from their id
+    def load_history(user_id):
+        rng = random.Random(user_id)
+        for _ in range(rng.randrange(attempts + 1)):
+            question_ids = [rng.randrange(question_count) + 1 for _ in range(QUIZ_LENGTH)]
+            yield pack_answers(question_ids, [rng.randrange(4) for _ in range(QUIZ_LENGTH)])
+    return load_history
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1e6 if samples else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--questions', type=int, default=100_000)
+    parser.add_argument('--attempts', type=int, default=40, help='most past quizzes per user')
+    parser.add_argument('--requests', type=int, default=50_000)
+    parser.add_argument('--budget-mb', type=int, default=64)
+    args = parser.parse_args()
+
+    question_bank = make_bank(args.questions)
+    selector = Selector(question_bank, history_loader(args.questions, args.attempts), args.budget_mb * 1024 * 1024)
+    rng = random.Random(42)
+    # Skewed traffic: user ids are log-uniform, so low ids take most of the quizzes
+    users = [int(args.users ** rng.random()) for _ in range(args.requests)]
+    hits, misses = [], []
+    started = time.perf_counter()
+    for user_id in users:
+        cached = user_id in selector
+        call_started = time.perf_counter()
+        questions = selector.sample(user_id, QUIZ_LENGTH, rng=rng)
+        elapsed = time.perf_counter() - call_started
+        (hits if cached else misses).append(elapsed)
+        selector.record(user_id, [question.id for question in questions], [rng.randrange(4) for _ in questions])
+    total = time.perf_counter() - started
+
+    hits.sort()
+    misses.sort()
+    print(f'{args.requests} quizzes for {len(set(users))} distinct users, {args.questions} questions in {total:.1f}s')
+    print(f'{"":<8}{"count":>8}{"p50 us":>10}{"p99 us":>10}')
+    for name, samples in (('cached', hits), ('rebuilt', misses)):
+        print(f'{name:<8}{len(samples):>8}{percentile(samples, 0.5):>10.1f}{percentile(samples, 0.99):>10.1f}')
+    print(f'histories cached: {len(selector)} using {selector.memory_used / 2**20:.1f} of {args.budget_mb} MiB')
+    print(f'peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+# Measure worker startup: importing app and drawing the first quiz
+# Run from the project root: python benchmarks/bench_startup.py
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 5
+
+# Timing and heap tracing run in separate processes; tracemalloc slows imports down
+PROBE = """
+import resource, sys, time, tracemalloc
+if sys.argv[1] == 'trace':
+    tracemalloc.start()
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+with app.app.app_context():
+    app.get_random_questions()
+ready = time.perf_counter()
+current, peak = tracemalloc.get_traced_memory()
+print((imported - started) * 1000, (ready - started) * 1000, current / 1024, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def probe(mode):
+    output = subprocess.run([sys.executable, '-c', PROBE, mode], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return [float(value) for value in output.split()]
+
+
+def main():
+    import_ms, ready_ms, _, rss_kb = (min(column) for column in zip(*(probe('time') for _ in range(RUNS))))
+    traced_kb = probe('trace')[2]
+    print(f'import app:        {import_ms:8.1f} ms')
+    print(f'first quiz ready:  {ready_ms:8.1f} ms')
+    print(f'python heap:       {traced_kb:8.0f} KiB')
+    print(f'max RSS:           {rss_kb:8.0f} KiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+# Shared helpers for the route benchmark and the load generator
+import json
+import os
+import random
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+BASELINE_OPTIONS = {'baseline', 'save_baseline', 'tolerance'}
+PASSWORD = 'password'
+
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def scratch_app(workdir=None, hash_method=None, rate_limits=False):
+    # Import the app against a throwaway SQLite database; must run before anything else imports app.
+    # Benchmarks log in many times from one address, so rate limiting is off unless asked for
+    workdir = workdir or tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    import app as quiz_app
+    quiz_app.app.instance_path = workdir
+    if hash_method:
+        quiz_app.app.config['PASSWORD_HASH_METHOD'] = hash_method
+    if not rate_limits:
+        quiz_app.ip_limiter = quiz_app.account_limiter = None
+    with quiz_app.app.app_context():
+        quiz_app.create_missing(quiz_app.db)
+    return quiz_app
+
+
+def seed(quiz_app, users, scores_per_user, seed=42):
+    # Users are user<n>@example.com with PASSWORD; scores go through record_scores
+    # so leaderboard summaries and stored answers match what the app writes
+    rng = random.Random(seed)
+    with quiz_app.app.app_context():
+        db = quiz_app.db
+        question_bank = quiz_app.get_question_bank()
+        user = quiz_app.User(username='seed', email='seed@example.com')
+        user.set_password(PASSWORD)
+        db.session.execute(quiz_app.User.__table__.insert(), [
+            {'username': f'user{number}', 'email': f'user{number}@example.com', 'password_hash': user.password_hash}
+            for number in range(1, users + 1)
+        ])
+        db.session.commit()
+        user_ids = db.session.scalars(db.select(quiz_app.User.id)).all()
+        records = []
+        submissions = 0
+        for user_id in user_ids:
+            for _ in range(scores_per_user):
+                questions = question_bank.sample(quiz_app.app.config['QUIZ_LENGTH'], rng=rng)
+                form = {str(question.id): str(rng.randrange(len(question.options))) for question in questions}
+                score, category_scores, answers = quiz_app.grade(question_bank, [question.id for question in questions], form)
+                submissions += 1
+                records.append({'id': f'seed-{submissions}', 'user_id': user_id, 'score': score,
+                                'category_scores': category_scores,
+                                'question_ids': [question.id for question in questions], 'answers': answers})
+                if len(records) >= 5000:
+                    quiz_app.record_scores(records)
+                    records = []
+        if records:
+            quiz_app.record_scores(records)
+
+
+def summarize(samples, elapsed):
+    # samples are latencies in seconds; elapsed is the wall time they were collected over
+    samples = sorted(samples)
+    if not samples:
+        return {'count': 0}
+
+    def percentile(fraction):
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))] * 1000
+
+    return {
+        'count': len(samples),
+        'p50_ms': round(percentile(0.50), 3),
+        'p95_ms': round(percentile(0.95), 3),
+        'p99_ms': round(percentile(0.99), 3),
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3),
+        'rps': round(len(samples) / elapsed, 1) if elapsed else None,
+    }
+
+
+def print_results(results, baseline=None):
+    print(f'{"step":<16}{"count":>7}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}{"req/s":>10}{"p95 vs base":>14}')
+    for step, stats in results.items():
+        change = ''
+        if baseline and step in baseline and baseline[step].get('p95_ms'):
+            change = f'{(stats["p95_ms"] / baseline[step]["p95_ms"] - 1) * 100:+.0f}%'
+        rps = stats.get('rps')
+        print(f'{step:<16}{stats["count"]:>7}{stats["p50_ms"]:>10.2f}{stats["p95_ms"]:>10.2f}{stats["p99_ms"]:>10.2f}'
+              f'{rps if rps is not None else "":>10}{change:>14}')
+
+
+def run_parameters(args):
+    # The options a run was made with, apart from those choosing what to compare it against
+    return {name: value for name, value in sorted(vars(args).items()) if name not in BASELINE_OPTIONS}
+
+
+def load_baseline(suite, path=BASELINE_PATH):
+    # Returns {'parameters': ..., 'results': ...} or None
+    try:
+        with open(path) as f:
+            return json.load(f).get(suite)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(suite, results, parameters, path=BASELINE_PATH):
+    try:
+        with open(path) as f:
+            baselines = json.load(f)
+    except FileNotFoundError:
+        baselines = {}
+    baselines[suite] = {'parameters': parameters, 'results': results}
+    with open(path, 'w') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def regressions(results, baseline, tolerance):
+    # Steps whose p95 grew by more than tolerance (a fraction) over the baseline
+    return [step for step, stats in results.items()
+            if baseline and step in baseline and baseline[step].get('p95_ms')
+            and stats['p95_ms'] > baseline[step]['p95_ms'] * (1 + tolerance)]
+
+
+def finish(suite, results, args):
+    parameters = run_parameters(args)
+    if args.save_baseline:
+        print_results(results)
+        save_baseline(suite, results, parameters, args.baseline)
+        print(f'saved baseline to {args.baseline}')
+        return 0
+    saved = load_baseline(suite, args.baseline)
+    baseline = None
+    if saved is not None:
+        # Timings from runs with other options say nothing about a regression
+        differences = {name: (saved.get('parameters', {}).get(name), value) for name, value in parameters.items()
+                       if saved.get('parameters', {}).get(name) != value}
+        if differences:
+            print('not comparing with the baseline, it was run with different options: ' + ', '.join(
+                f'{name}={old!r} (now {new!r})' for name, (old, new) in differences.items()))
+        else:
+            baseline = saved['results']
+    print_results(results, baseline)
+    slower = regressions(results, baseline, args.tolerance)
+    if slower:
+        print(f'p95 regressed by more than {args.tolerance:.0%}: {", ".join(slower)}')
+        return 1
+    return 0
+
+
+def add_baseline_arguments(parser):
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline file to compare with or save to')
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p95 slowdown before failing')
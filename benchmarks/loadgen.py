@@ -0,0 +1,131 @@
+# Multi-process load generator: serves the app from a seeded scratch
+# database and drives register -> login -> quiz -> submit -> results flows
+# over HTTP from several client processes at once.
+# Run from the project root: python benchmarks/loadgen.py [--clients N] [--duration S] [--save-baseline]
+import argparse
+import http.client
+import logging
+import multiprocessing
+import re
+import socket
+import sys
+import tempfile
+import time
+from urllib.parse import urlencode
+
+from common import PASSWORD, add_baseline_arguments, finish, scratch_app, seed, summarize
+
+
+def serve(workdir, port, users, scores_per_user, hash_method, threaded, ready):
+    from werkzeug.serving import make_server
+
+    quiz_app = scratch_app(workdir, hash_method)
+    seed(quiz_app, users, scores_per_user)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', port, quiz_app.app, threaded=threaded)
+    ready.set()
+    server.serve_forever()
+
+
+class Client:
+    # Minimal keep-alive HTTP client that carries the session cookie
+    def __init__(self, port):
+        self.connection = http.client.HTTPConnection('127.0.0.1', port)
+        self.cookie = None
+
+    def request(self, method, path, form=None):
+        headers = {}
+        body = None
+        if form is not None:
+            body = urlencode(form)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        if self.cookie:
+            headers['Cookie'] = self.cookie
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        data = response.read()
+        cookie = response.getheader('Set-Cookie')
+        if cookie:
+            self.cookie = cookie.split(';', 1)[0]
+        if response.status not in (200, 302):
+            raise RuntimeError(f'{method} {path} returned {response.status}')
+        return data.decode()
+
+
+def drive(number, port, duration, users, results):
+    samples = {}
+    deadline = time.monotonic() + duration
+
+    def timed(step, *args):
+        started = time.perf_counter()
+        data = client.request(*args)
+        samples.setdefault(step, []).append(time.perf_counter() - started)
+        return data
+
+    flow = 0
+    while time.monotonic() < deadline:
+        client = Client(port)
+        flow += 1
+        timed('register', 'POST', '/register', {'username': f'load{number}-{flow}',
+                                                'email': f'load{number}-{flow}@example.com', 'password': PASSWORD})
+        timed('logout', 'GET', '/logout')
+        timed('login', 'POST', '/login', {'email': f'user{(number * 7919 + flow) % users + 1}@example.com',
+                                          'password': PASSWORD})
+        page = timed('quiz_start', 'GET', '/quiz')
+        timed('quiz_submit', 'POST', '/quiz', dict(re.findall(r'name="(\d+)" value="([^"]*)"', page)))
+        timed('results', 'GET', '/results')
+        timed('leaderboard', 'GET', '/leaderboard')
+        client.connection.close()
+    results.put(samples)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20, help='seconds each client keeps running flows')
+    parser.add_argument('--users', type=int, default=200, help='seeded users')
+    parser.add_argument('--scores-per-user', type=int, default=50)
+    parser.add_argument('--hash-method', help='override PASSWORD_HASH_METHOD, e.g. pbkdf2:sha256:1000')
+    parser.add_argument('--single-threaded', action='store_true', help='serve one request at a time')
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    port = free_port()
+    ready = context.Event()
+    server = context.Process(target=serve, daemon=True, args=(
+        tempfile.mkdtemp(), port, args.users, args.scores_per_user, args.hash_method, not args.single_threaded, ready))
+    server.start()
+    if not ready.wait(300):
+        server.terminate()
+        raise SystemExit('server did not start')
+
+    results = context.Queue()
+    clients = [context.Process(target=drive, args=(number, port, args.duration, args.users, results))
+               for number in range(args.clients)]
+    started = time.perf_counter()
+    for client in clients:
+        client.start()
+    samples = {}
+    for _ in clients:
+        for step, values in results.get().items():
+            samples.setdefault(step, []).extend(values)
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        client.join()
+    server.terminate()
+
+    results = {step: summarize(values, elapsed) for step, values in samples.items()}
+    results['all'] = summarize([value for values in samples.values() for value in values], elapsed)
+    print(f'{args.clients} clients for {elapsed:.1f}s')
+    return finish('loadgen', results, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
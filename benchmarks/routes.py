@@ -0,0 +1,70 @@
+# Flask test-client benchmark of every route, driven through the
+# register -> login -> quiz -> submit -> results flow on a seeded database.
+# Run from the project root: python benchmarks/routes.py [--flows N] [--save-baseline]
+import argparse
+import re
+import sys
+import time
+
+from common import PASSWORD, add_baseline_arguments, finish, scratch_app, seed, summarize
+
+STEPS = ['index', 'register', 'logout', 'login', 'quiz_start', 'quiz_submit', 'results', 'results_page2',
+         'leaderboard', 'metrics']
+
+
+def timed(samples, step, call, expected=(200, 302)):
+    started = time.perf_counter()
+    response = call()
+    samples[step].append(time.perf_counter() - started)
+    assert response.status_code in expected, (step, response.status_code)
+    return response
+
+
+def run_flows(quiz_app, flows, users):
+    app = quiz_app.app
+    samples = {step: [] for step in STEPS}
+    for number in range(flows):
+        client = app.test_client()
+        timed(samples, 'index', lambda: client.get('/'))
+        email = f'flow{number}@example.com'
+        timed(samples, 'register', lambda: client.post('/register', data={
+            'username': f'flow{number}', 'email': email, 'password': PASSWORD}))
+        timed(samples, 'logout', lambda: client.get('/logout'))
+        # Log in as a seeded user so results and leaderboard have history to show
+        seeded = f'user{number % users + 1}@example.com'
+        timed(samples, 'login', lambda: client.post('/login', data={'email': seeded, 'password': PASSWORD}))
+        page = timed(samples, 'quiz_start', lambda: client.get('/quiz')).data.decode()
+        answers = dict(re.findall(r'name="(\d+)" value="([^"]*)"', page))
+        timed(samples, 'quiz_submit', lambda: client.post('/quiz', data=answers))
+        page = timed(samples, 'results', lambda: client.get('/results')).data.decode()
+        older = re.search(r'before=(\d+)', page)
+        if older:
+            timed(samples, 'results_page2', lambda: client.get(f'/results?before={older.group(1)}'))
+        timed(samples, 'leaderboard', lambda: client.get('/leaderboard'))
+        if app.config['METRICS_ENABLED']:
+            timed(samples, 'metrics', lambda: client.get('/metrics'))
+    # Requests run one at a time, so throughput per step is the inverse of its mean latency
+    return {step: summarize(values, sum(values)) for step, values in samples.items() if values}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--flows', type=int, default=200)
+    parser.add_argument('--users', type=int, default=200, help='seeded users')
+    parser.add_argument('--scores-per-user', type=int, default=50)
+    parser.add_argument('--hash-method', help='override PASSWORD_HASH_METHOD, e.g. pbkdf2:sha256:1000')
+    add_baseline_arguments(parser)
+    args = parser.parse_args()
+
+    quiz_app = scratch_app(hash_method=args.hash_method)
+    started = time.perf_counter()
+    seed(quiz_app, args.users, args.scores_per_user)
+    print(f'seeded {args.users} users x {args.scores_per_user} scores in {time.perf_counter() - started:.1f}s')
+    # One warm-up flow fills the question bank, fragment and leaderboard caches
+    run_flows(quiz_app, 1, args.users)
+    results = run_flows(quiz_app, args.flows, args.users)
+    return finish('routes', results, args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+from sqlalchemy import event, inspect, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+
+
+def database_url(url):
+    # Hosting providers still hand out the postgres:// scheme SQLAlchemy dropped
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def engine_options(url, environ):
+    url = make_url(url)
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            return {}
+        # Wait for the write lock instead of failing with "database is locked"
+        return {'connect_args': {'timeout': float(environ.get('DB_BUSY_TIMEOUT', 30))},
+                'pool_size': int(environ.get('DB_POOL_SIZE', 10)),
+                'max_overflow': int(environ.get('DB_MAX_OVERFLOW', 20))}
+    return {
+        'pool_size': int(environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True,
+    }
+
+
+def upsert(engine, table):
+    # INSERT ... ON CONFLICT DO UPDATE, spelled the same way by both supported backends
+    dialects = {'sqlite': sqlite, 'postgresql': postgresql}
+    if engine.dialect.name not in dialects:
+        raise NotImplementedError(f'No upsert support for {engine.dialect.name}')
+    return dialects[engine.dialect.name].insert(table)
+
+
+def install_sqlite_pragmas(engine, pragmas):
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def create_missing(db):
+    # create_all() skips tables that already exist, so add any nullable
+    # columns and indexes introduced since the database was first created
+    db.create_all()
+    inspector = inspect(db.engine)
+    quote = db.engine.dialect.identifier_preparer.quote
+    with db.engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    raise RuntimeError(f'Cannot add required column {table.name}.{column.name} to an existing table')
+                column_type = column.type.compile(dialect=db.engine.dialect)
+                connection.execute(text(f'ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column_type}'))
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
@@ -0,0 +1,88 @@
+import heapq
+import threading
+import time
+
+
+class DeadlineScheduler:
+    # Calls handle(keys) on one background thread once their deadlines (time.time()
+    # timestamps) pass, in batches of up to batch_size. Deadlines sit in a heap;
+    # cancelled or moved ones are skipped when they reach the top, so the heap holds
+    # at most the entries scheduled within one deadline period. A failed batch is
+    # rescheduled retry_delay seconds later.
+
+    def __init__(self, handle, batch_size=100, retry_delay=5, on_error=None):
+        self.handle = handle
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self.on_error = on_error
+        self._heap = []
+        self._deadlines = {}
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='deadline-scheduler', daemon=True)
+        self._thread.start()
+
+    def schedule(self, key, deadline):
+        with self._condition:
+            self._deadlines[key] = deadline
+            heapq.heappush(self._heap, (deadline, key))
+            if self._heap[0] == (deadline, key):
+                self._condition.notify()
+
+    def cancel(self, key):
+        with self._condition:
+            self._deadlines.pop(key, None)
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _drop_stale(self):
+        while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _next_batch(self):
+        with self._condition:
+            while True:
+                if self._closed:
+                    return None
+                self._drop_stale()
+                timeout = None
+                if self._heap:
+                    timeout = self._heap[0][0] - time.time()
+                    if timeout <= 0:
+                        break
+                self._condition.wait(timeout)
+            due = []
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+                deadline, key = heapq.heappop(self._heap)
+                if self._deadlines.get(key) == deadline:
+                    del self._deadlines[key]
+                    due.append(key)
+            return due
+
+    def _run(self):
+        while True:
+            due = self._next_batch()
+            if due is None:
+                return
+            if not due:
+                continue
+            try:
+                self.handle(due)
+            except Exception as error:
+                if self.on_error is not None:
+                    self.on_error(error)
+                retry_at = time.time() + self.retry_delay
+                for key in due:
+                    self.schedule(key, retry_at)
@@ -0,0 +1,45 @@
+import threading
+from collections import OrderedDict
+
+
+class FragmentCache:
+    # LRU cache of rendered HTML fragments, bounded by the total number of
+    # characters held. Entries belong to one version (e.g. the question bank
+    # hash); asking for a different version drops everything cached so far.
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.size = 0
+        self.version = None
+        self._fragments = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version, key, render):
+        with self._lock:
+            if version != self.version:
+                self._clear(version)
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+                return fragment
+        fragment = render()
+        with self._lock:
+            if version == self.version and key not in self._fragments and len(fragment) <= self.max_size:
+                self._fragments[key] = fragment
+                self.size += len(fragment)
+                while self.size > self.max_size:
+                    _, evicted = self._fragments.popitem(last=False)
+                    self.size -= len(evicted)
+        return fragment
+
+    def clear(self):
+        with self._lock:
+            self._clear(None)
+
+    def _clear(self, version):
+        self._fragments.clear()
+        self.size = 0
+        self.version = version
+
+    def __len__(self):
+        return len(self._fragments)
@@ -0,0 +1,39 @@
+from array import array
+
+UNANSWERED = -1
+
+
+def pack_answers(question_ids, answers):
+    # Stored per score: question ids as uint32 and chosen option indices as int8
+    return array('I', question_ids).tobytes(), array('b', answers).tobytes()
+
+
+def unpack_answers(packed_question_ids, packed_answers):
+    return array('I', packed_question_ids).tolist(), array('b', packed_answers).tolist()
+
+
+def read_answer(value, option_count):
+    try:
+        answer = int(value)
+    except (TypeError, ValueError):
+        return UNANSWERED
+    return answer if 0 <= answer < option_count else UNANSWERED
+
+
+def grade(question_bank, question_ids, form):
+    # Returns the score, correct answers per category and the chosen option per question
+    score = 0
+    category_scores = {}
+    answers = []
+    for question_id in question_ids:
+        question = question_bank.get(question_id)
+        if question is None:
+            answers.append(UNANSWERED)
+            continue
+        answer = read_answer(form.get(str(question_id)), len(question.options))
+        answers.append(answer)
+        category_scores.setdefault(question.category, 0)
+        if answer == question.answer:
+            score += 1
+            category_scores[question.category] += 1
+    return score, category_scores, answers
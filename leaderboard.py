@@ -0,0 +1,107 @@
+import bisect
+import threading
+import time
+
+
+class RankIndex:
+    # Sorted ranking keys for one category. Higher best score ranks first,
+    # then higher total, then the earlier user id, so bisect gives a rank in
+    # O(log n).
+
+    def __init__(self, entries):
+        self.keys = sorted((-best_score, -total_score, user_id) for user_id, best_score, total_score in entries)
+        self.built_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.keys)
+
+    def rank(self, user_id, best_score, total_score):
+        return bisect.bisect_left(self.keys, (-best_score, -total_score, user_id)) + 1
+
+    def update(self, user_id, old, new):
+        # Applying a change the index already holds leaves it as it is
+        if old is not None:
+            key = (-old[0], -old[1], user_id)
+            position = bisect.bisect_left(self.keys, key)
+            if position < len(self.keys) and self.keys[position] == key:
+                del self.keys[position]
+        key = (-new[0], -new[1], user_id)
+        position = bisect.bisect_left(self.keys, key)
+        if position == len(self.keys) or self.keys[position] != key:
+            self.keys.insert(position, key)
+
+
+class Leaderboard:
+    # Per-process cache over the leaderboard summary table: the top rows and
+    # a RankIndex for each category. Writes made by this process are applied
+    # in place; other workers' writes show up after refresh_interval seconds.
+    # Only the first index for a category is built inside a request: a stale
+    # one keeps serving while its replacement loads on a background thread.
+
+    def __init__(self, load_entries, load_top, top_size=10, refresh_interval=60):
+        self.load_entries = load_entries  # category -> [(user_id, best_score, total_score)]
+        self.load_top = load_top  # (category, limit) -> rows in rank order
+        self.top_size = top_size
+        self.refresh_interval = refresh_interval
+        self._indexes = {}
+        self._rebuilding = {}  # category -> changes recorded while its index loads
+        self._tops = {}
+        self._lock = threading.Lock()
+
+    def top(self, category):
+        cached = self._tops.get(category)
+        if cached is not None and time.monotonic() - cached[0] < self.refresh_interval:
+            return cached[1]
+        rows = self.load_top(category, self.top_size)
+        with self._lock:
+            self._tops[category] = (time.monotonic(), rows)
+        return rows
+
+    def rank(self, category, user_id, best_score, total_score):
+        return self._index(category).rank(user_id, best_score, total_score)
+
+    def size(self, category):
+        return len(self._index(category))
+
+    def record(self, category, user_id, old, new):
+        # old/new are (best_score, total_score) pairs; old is None for a new entry
+        with self._lock:
+            if category in self._rebuilding:
+                self._rebuilding[category].append((user_id, old, new))
+            index = self._indexes.get(category)
+            if index is None:
+                self._tops.pop(category, None)
+                return
+            was_top = old is not None and index.rank(user_id, *old) <= self.top_size
+            index.update(user_id, old, new)
+            # Only a change that enters or leaves the top rows invalidates them
+            if was_top or index.rank(user_id, *new) <= self.top_size:
+                self._tops.pop(category, None)
+
+    def _index(self, category):
+        index = self._indexes.get(category)
+        if index is not None and time.monotonic() - index.built_at < self.refresh_interval:
+            return index
+        with self._lock:
+            started = category not in self._rebuilding
+            if started:
+                self._rebuilding[category] = []
+        if index is None:
+            return self._rebuild(category)
+        if started:
+            threading.Thread(target=self._rebuild, args=(category,), name='leaderboard-rebuild', daemon=True).start()
+        return index
+
+    def _rebuild(self, category):
+        try:
+            index = RankIndex(self.load_entries(category))
+        except BaseException:
+            with self._lock:
+                self._rebuilding.pop(category, None)
+            raise
+        with self._lock:
+            # Writes made while the entries loaded may or may not be in them; update() handles both
+            for change in self._rebuilding.pop(category, ()):
+                index.update(*change)
+            self._indexes[category] = index
+        return index
@@ -0,0 +1,163 @@
+import bisect
+import contextlib
+import cProfile
+import os
+import random
+import threading
+import time
+
+from flask import Response, g, has_request_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096)
+
+_NULL_TIMER = contextlib.nullcontext()
+registry = None  # Set by init_metrics; None means instrumentation is off
+
+
+class Histogram:
+    def __init__(self, name, help, label_names, buckets):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+        for labels, counts, total in series:
+            label_text = ','.join(f'{name}="{escape(value)}"' for name, value in zip(self.label_names, labels))
+            prefix = label_text + ',' if label_text else ''
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+            suffix = f'{{{label_text}}}' if label_text else ''
+            lines.append(f'{self.name}_sum{suffix} {total}')
+            lines.append(f'{self.name}_count{suffix} {cumulative}')
+        return lines
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Registry:
+    def __init__(self):
+        self.request_seconds = Histogram('quiz_request_duration_seconds', 'Time spent handling a request.',
+                                         ('endpoint', 'method', 'status'), LATENCY_BUCKETS)
+        self.sql_queries = Histogram('quiz_request_sql_queries', 'SQL statements executed per request.',
+                                     ('endpoint',), COUNT_BUCKETS)
+        self.sql_seconds = Histogram('quiz_request_sql_seconds', 'Time spent in SQL per request.',
+                                     ('endpoint',), LATENCY_BUCKETS)
+        self.render_seconds = Histogram('quiz_template_render_seconds', 'Time spent rendering a template.',
+                                        ('template',), LATENCY_BUCKETS)
+        self.cookie_bytes = Histogram('quiz_session_cookie_bytes', 'Size of the session cookie sent by clients.',
+                                      (), SIZE_BUCKETS)
+        self.operation_seconds = Histogram('quiz_operation_seconds', 'Time spent in instrumented operations.',
+                                           ('operation',), LATENCY_BUCKETS)
+        self.histograms = [self.request_seconds, self.sql_queries, self.sql_seconds,
+                           self.render_seconds, self.cookie_bytes, self.operation_seconds]
+
+    def render(self):
+        lines = []
+        for histogram in self.histograms:
+            lines.extend(histogram.render())
+        return '\n'.join(lines) + '\n'
+
+
+class _Timer:
+    __slots__ = ('operation', 'started')
+
+    def __init__(self, operation):
+        self.operation = operation
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        registry.operation_seconds.observe(time.perf_counter() - self.started, self.operation)
+
+
+def timer(operation):
+    # A shared no-op context manager while metrics are disabled
+    if registry is None:
+        return _NULL_TIMER
+    return _Timer(operation)
+
+
+def init_metrics(app, engine, profiler_sample_rate=0.0, profiler_dir=None):
+    global registry
+    registry = Registry()
+
+    @app.before_request
+    def start_request():
+        g.metrics_started = time.perf_counter()
+        g.sql_queries = 0
+        g.sql_seconds = 0.0
+        g.render_started = []
+        cookie = request.cookies.get(app.config['SESSION_COOKIE_NAME'])
+        if cookie is not None:
+            registry.cookie_bytes.observe(len(cookie))
+        if profiler_sample_rate and random.random() < profiler_sample_rate:
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def finish_request(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        endpoint = request.endpoint or 'unknown'
+        registry.request_seconds.observe(time.perf_counter() - started, endpoint, request.method, response.status_code)
+        registry.sql_queries.observe(g.sql_queries, endpoint)
+        registry.sql_seconds.observe(g.sql_seconds, endpoint)
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(profiler_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(profiler_dir, f'{endpoint}-{time.time_ns()}.prof'))
+        return response
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query(connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def finish_query(connection, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - connection.info['query_started'].pop()
+        if has_request_context() and 'sql_queries' in g:
+            g.sql_queries += 1
+            g.sql_seconds += elapsed
+
+    def start_render(sender, template, context, **extra):
+        if has_request_context() and 'render_started' in g:
+            g.render_started.append(time.perf_counter())
+
+    def finish_render(sender, template, context, **extra):
+        if has_request_context() and g.get('render_started'):
+            registry.render_seconds.observe(time.perf_counter() - g.render_started.pop(), template.name or 'string')
+
+    before_render_template.connect(start_render, app, weak=False)
+    template_rendered.connect(finish_render, app, weak=False)
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+    return registry
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import random
+import threading
+import time
+from array import array
+
+logger = logging.getLogger(__name__)
+
+BANK_FORMAT = 'quiz-bank'
+BANK_FORMAT_VERSION = 1
+CACHE_VERSION = 1  # Bump when Question or QuestionBank change shape, so old pickles are not loaded
+
+
+class Question:
+    __slots__ = ('id', 'category', 'text', 'options', 'answer')
+
+    def __init__(self, id, category, text, options, answer):
+        self.id = id
+        self.category = category
+        self.text = text
+        self.options = tuple(options)
+        self.answer = answer  # Index into options
+
+
+class QuestionBank:
+    # Questions live in one dense list; categories index into it by position
+    # so sampling never has to walk the whole bank.
+
+    def __init__(self, questions, version=None):
+        self.version = version  # Hash of the source file the bank was built from
+        self.questions = []
+        self.positions = {}
+        self.categories = {}
+        for question in questions:
+            position = len(self.questions)
+            self.questions.append(question)
+            self.positions[question.id] = position
+            self.categories.setdefault(question.category, array('I')).append(position)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def __contains__(self, question_id):
+        return question_id in self.positions
+
+    def get(self, question_id):
+        position = self.positions.get(question_id)
+        return None if position is None else self.questions[position]
+
+    def sample(self, k, stratify=False, rng=random):
+        # random.sample over a range picks k distinct positions in O(k)
+        k = min(k, len(self.questions))
+        if not stratify:
+            return [self.questions[position] for position in rng.sample(range(len(self.questions)), k)]
+        picked = []
+        for category, count in self._allocate(k).items():
+            positions = self.categories[category]
+            picked.extend(self.questions[position] for position in rng.sample(positions, count))
+        rng.shuffle(picked)
+        return picked
+
+    def _allocate(self, k):
+        # Split k across categories in proportion to their size (largest remainder)
+        total = len(self.questions)
+        shares = {category: k * len(positions) / total for category, positions in self.categories.items()}
+        counts = {category: int(share) for category, share in shares.items()}
+        remainder = k - sum(counts.values())
+        for category in sorted(shares, key=lambda category: shares[category] - counts[category], reverse=True)[:remainder]:
+            counts[category] += 1
+        return counts
+
+
+def parse_question_bank(data, version=None):
+    lines = data.decode('utf-8').splitlines()
+    header = json.loads(lines[0]) if lines else {}
+    if header.get('format') != BANK_FORMAT or header.get('version') != BANK_FORMAT_VERSION:
+        raise ValueError(f'Unsupported question bank format: {header!r}')
+    questions = []
+    for line in lines[1:]:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        questions.append(Question(record['id'], record['category'], record['question'],
+                                  record['options'], record['options'].index(record['correct'])))
+    return QuestionBank(questions, version=version)
+
+
+def load_question_bank(path, cache_dir=None):
+    # The parsed bank is pickled next to the instance data, keyed by the
+    # source file hash and the format and cache versions, so workers skip
+    # JSON parsing when nothing changed.
+    with open(path, 'rb') as f:
+        data = f.read()
+    version = hashlib.sha256(data).hexdigest()[:16]
+    if cache_dir is None:
+        return parse_question_bank(data, version)
+    prefix = os.path.basename(path) + '.'
+    cache_path = os.path.join(cache_dir, f'{prefix}{version}.v{BANK_FORMAT_VERSION}.{CACHE_VERSION}.pickle')
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+    bank = parse_question_bank(data, version)
+    os.makedirs(cache_dir, exist_ok=True)
+    temp_path = f'{cache_path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as f:
+        pickle.dump(bank, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, cache_path)
+    # Drop caches built from older versions of the file
+    for name in os.listdir(cache_dir):
+        if name.startswith(prefix) and name.endswith('.pickle') and name != os.path.basename(cache_path):
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+    return bank
+
+
+class QuestionBankLoader:
+    # Loads the bank on first use and re-checks the file at most once per
+    # reload_interval seconds, swapping in a new bank when it has changed.
+    # A file that is missing or fails to parse keeps the current bank in
+    # service and is tried again at the next interval.
+
+    def __init__(self, path, cache_dir=None, reload_interval=5):
+        self.path = path
+        self.cache_dir = cache_dir
+        self.reload_interval = reload_interval
+        self._bank = None
+        self._stat = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        bank = self._bank
+        if bank is not None and (not self.reload_interval or time.monotonic() - self._checked_at < self.reload_interval):
+            return bank
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                stat = os.stat(self.path)
+                stat = (stat.st_mtime_ns, stat.st_size)
+                if self._bank is None or stat != self._stat:
+                    self._bank = load_question_bank(self.path, self.cache_dir)
+                    self._stat = stat
+            except Exception as error:
+                if self._bank is None:
+                    raise
+                logger.error('Reloading %s failed, keeping the current question bank: %s', self.path, error)
+            return self._bank
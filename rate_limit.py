@@ -0,0 +1,111 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+PRUNE_EVERY = 1000  # Takes between sweeps of refilled buckets from the shared table
+
+
+def refill(tokens, updated, now, burst, rate):
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+class MemoryRateLimiter:
+    # Token buckets holding up to burst tokens that refill over period seconds, one per key.
+    # At most max_keys buckets are kept; dropping the least recently used one only
+    # forgets a bucket that has had the longest to refill.
+
+    def __init__(self, burst, period, max_keys=100000):
+        self.burst = burst
+        self.rate = burst / period
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, cost=1):
+        # Returns 0 when the request may go ahead, otherwise seconds until it could
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.burst, now]
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            tokens = refill(bucket[0], bucket[1], now, self.burst, self.rate)
+            bucket[1] = now
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                return 0
+            bucket[0] = tokens
+            return (cost - tokens) / self.rate
+
+    def refund(self, key, cost=1):
+        # Gives back tokens taken for a request that turned out not to count
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(self.burst, bucket[0] + cost)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class SQLiteRateLimiter:
+    # The same buckets kept in a SQLite file so every worker process shares them.
+    # name separates limiters sharing one file; a bucket is deleted once it would be full again.
+
+    def __init__(self, path, name, burst, period):
+        self.path = path
+        self.name = name
+        self.burst = burst
+        self.rate = burst / period
+        self._local = threading.local()
+        self._takes = 0
+        with self._connect() as connection:
+            connection.execute('CREATE TABLE IF NOT EXISTS buckets '
+                               '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS ix_buckets_full_at ON buckets (full_at)')
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def take(self, key, cost=1):
+        key = f'{self.name}:{key}'
+        connection = self._connect()
+        now = time.time()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens = self.burst if row is None else refill(row[0], row[1], now, self.burst, self.rate)
+            retry_after = 0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                retry_after = (cost - tokens) / self.rate
+            connection.execute(
+                'INSERT INTO buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated, '
+                'full_at = excluded.full_at',
+                (key, tokens, now, now + (self.burst - tokens) / self.rate))
+            self._takes += 1
+            if self._takes % PRUNE_EVERY == 0:
+                connection.execute('DELETE FROM buckets WHERE full_at < ?', (now,))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return retry_after
+
+    def refund(self, key, cost=1):
+        # A bucket whose full_at ends up in the past is full and may be pruned
+        self._connect().execute(
+            'UPDATE buckets SET tokens = MIN(?, tokens + ?), full_at = full_at - ? WHERE key = ?',
+            (self.burst, cost, cost / self.rate, f'{self.name}:{key}'))
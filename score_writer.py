@@ -0,0 +1,140 @@
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single process per instance directory
+    fcntl = None
+
+
+def claim_journal(directory, name='scores'):
+    # Each worker process locks its own journal slot. A restarted worker
+    # takes over a slot whose owner died and replays what it left behind.
+    os.makedirs(directory, exist_ok=True)
+    slot = 0
+    while True:
+        path = os.path.join(directory, f'{name}.{slot}.journal')
+        lock = open(path + '.lock', 'a')
+        if fcntl is None:
+            return path, lock
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return path, lock
+        except BlockingIOError:
+            lock.close()
+            slot += 1
+
+
+class ScoreWriter:
+    # Write-behind buffer for graded quizzes. Records are appended to a local
+    # journal before they are acknowledged, then written to the database by
+    # one background thread in transactions of at most batch_size records.
+    # Everything pending is moved aside as <journal>.flushing and that file is
+    # deleted once all of its batches have committed, so whatever is left on
+    # disk after a crash is replayed on the next start; the flush callback
+    # skips records a previous run already committed.
+
+    def __init__(self, flush, journal_path, batch_size=200, flush_interval=0.5, max_pending=10000,
+                 fsync=False, on_error=None):
+        self.flush = flush  # Called with a list of records; must commit them or raise
+        self.journal_path = journal_path
+        self.flushing_path = journal_path + '.flushing'
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.fsync = fsync  # Also survive power loss, at the cost of an fsync per record
+        self.on_error = on_error
+        self._pending = []
+        self._flushing = []  # Records in <journal>.flushing not yet committed
+        self._journal = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        self._replay()
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name='score-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, record):
+        # Returns False when the buffer is full so the caller can write directly
+        with self._condition:
+            if self._closed or len(self._pending) + len(self._flushing) >= self.max_pending:
+                return False
+            self._journal.write(json.dumps(record, separators=(',', ':')) + '\n')
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._pending.append(record)
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+            return True
+
+    def pending_for(self, user_id):
+        with self._condition:
+            return [record for record in self._flushing + self._pending if record['user_id'] == user_id]
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _replay(self):
+        records = []
+        for path in (self.flushing_path, self.journal_path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    for line in f:
+                        # A torn last line means the record was never acknowledged
+                        try:
+                            records.append(json.loads(line))
+                        except ValueError:
+                            pass
+            except FileNotFoundError:
+                pass
+        for start in range(0, len(records), self.batch_size):
+            self.flush(records[start:start + self.batch_size])
+        for path in (self.flushing_path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._flushing:
+                    deadline = time.monotonic() + self.flush_interval
+                    while not self._closed and len(self._pending) < self.batch_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    if not self._pending:
+                        if self._closed:
+                            self._journal.close()
+                            os.remove(self.journal_path)
+                            return
+                        continue
+                    self._flushing, self._pending = self._pending, []
+                    self._journal.close()
+                    os.replace(self.journal_path, self.flushing_path)
+                    self._journal = open(self.journal_path, 'a', encoding='utf-8')
+                batch = self._flushing[:self.batch_size]
+                closed = self._closed
+            try:
+                self.flush(batch)
+            except Exception as error:
+                if self.on_error is not None:
+                    self.on_error(error)
+                if closed:
+                    return
+                time.sleep(self.flush_interval)
+                continue
+            with self._condition:
+                del self._flushing[:len(batch)]
+                if not self._flushing:
+                    os.remove(self.flushing_path)
@@ -0,0 +1,179 @@
+import random
+import threading
+import time
+from array import array
+from bisect import bisect
+from collections import OrderedDict
+from itertools import accumulate
+
+from grading import unpack_answers
+
+WEAKNESS_FLOOR = 0.25  # Keeps categories the user is strong in from disappearing
+DIFFICULTY_SPREAD = 0.75  # How strongly questions far from the user's level are rejected
+TRIALS_PER_QUESTION = 20  # Draws per missing question before a pass gives up
+HISTORY_OVERHEAD = 200  # Approximate bytes of object overhead per cached history
+
+
+class History:
+    # One user's answers as bitsets over bank positions plus per-category totals;
+    # 100k questions take 25KB per user however many quizzes they have taken
+
+    __slots__ = ('seen', 'correct', 'asked', 'right', 'size', 'built_at')
+
+    def __init__(self, question_count, category_count):
+        self.seen = bytearray((question_count + 7) // 8)
+        self.correct = bytearray(len(self.seen))
+        self.asked = array('I', bytes(4 * category_count))
+        self.right = array('I', bytes(4 * category_count))
+        self.size = 2 * len(self.seen) + 8 * category_count + HISTORY_OVERHEAD
+        self.built_at = time.monotonic()
+
+    def add(self, position, category, is_correct):
+        # The latest answer to a question decides whether it counts as mastered
+        index, bit = position >> 3, 1 << (position & 7)
+        self.seen[index] |= bit
+        if is_correct:
+            self.correct[index] |= bit
+        else:
+            self.correct[index] &= ~bit
+        self.asked[category] += 1
+        self.right[category] += is_correct
+
+    def has_seen(self, position):
+        return self.seen[position >> 3] >> (position & 7) & 1
+
+    def has_mastered(self, position):
+        return self.correct[position >> 3] >> (position & 7) & 1
+
+
+class Selector:
+    # Picks quiz questions for one question bank, preferring questions the user has
+    # not seen, categories they are weak in and questions near their level.
+    # Histories live in an LRU bounded by memory_budget bytes and are rebuilt with
+    # load_history(user_id), which yields (packed question ids, packed answers) pairs.
+    # Quizzes graded in other processes only reach a cached history when it is
+    # rebuilt, which happens once it is max_age seconds old (None keeps it until evicted).
+
+    def __init__(self, question_bank, load_history, memory_budget, max_age=None):
+        self.question_bank = question_bank
+        self.load_history = load_history
+        self.memory_budget = memory_budget
+        self.max_age = max_age
+        question_count = len(question_bank)
+        self.category_names = sorted(question_bank.categories)
+        self.category_positions = [question_bank.categories[name] for name in self.category_names]
+        self.category_of = array('H', bytes(2 * question_count))
+        for category, positions in enumerate(self.category_positions):
+            for position in positions:
+                self.category_of[position] = category
+        # Times each question was asked and answered correctly, across all users
+        self.asked = array('I', bytes(4 * question_count))
+        self.right = array('I', bytes(4 * question_count))
+        self.memory_used = 0
+        self._histories = OrderedDict()
+        self._lock = threading.Lock()
+
+    def set_question_stats(self, asked, right):
+        # Seed difficulty, e.g. from the question analytics report; sequences are in bank order
+        with self._lock:
+            self.asked = array('I', asked)
+            self.right = array('I', right)
+
+    def history(self, user_id):
+        with self._lock:
+            history = self._histories.get(user_id)
+            if history is not None and not self._is_stale(history):
+                self._histories.move_to_end(user_id)
+                return history
+        history = self._build(self.load_history(user_id))
+        with self._lock:
+            current = self._histories.get(user_id)
+            if current is None or self._is_stale(current):
+                if current is not None:
+                    self.memory_used -= current.size
+                self._histories[user_id] = history
+                self._histories.move_to_end(user_id)
+                self.memory_used += history.size
+                while self.memory_used > self.memory_budget and len(self._histories) > 1:
+                    self.memory_used -= self._histories.popitem(last=False)[1].size
+            return self._histories[user_id]
+
+    def _is_stale(self, history):
+        return self.max_age is not None and time.monotonic() - history.built_at >= self.max_age
+
+    def _build(self, rows):
+        history = History(len(self.question_bank), len(self.category_names))
+        positions = self.question_bank.positions
+        questions = self.question_bank.questions
+        for packed_question_ids, packed_answers in rows:
+            question_ids, answers = unpack_answers(packed_question_ids, packed_answers)
+            for question_id, answer in zip(question_ids, answers):
+                position = positions.get(question_id)
+                if position is not None:
+                    history.add(position, self.category_of[position], answer == questions[position].answer)
+        return history
+
+    def record(self, user_id, question_ids, answers):
+        # Fold a graded quiz into the difficulty counts and the user's cached history
+        positions = self.question_bank.positions
+        questions = self.question_bank.questions
+        with self._lock:
+            history = self._histories.get(user_id)
+            for question_id, answer in zip(question_ids, answers):
+                position = positions.get(question_id)
+                if position is None:
+                    continue
+                is_correct = answer == questions[position].answer
+                self.asked[position] += 1
+                self.right[position] += is_correct
+                if history is not None:
+                    history.add(position, self.category_of[position], is_correct)
+
+    def __contains__(self, user_id):
+        return user_id in self._histories
+
+    def __len__(self):
+        return len(self._histories)
+
+    def sample(self, user_id, k, rng=random):
+        # Rejection sampling: a category is drawn by size times weakness, a position
+        # uniformly within it, and the draw is kept with a probability that falls
+        # with the distance between the question's ease and the user's accuracy.
+        # Expected work is O(k) draws while most of the bank is eligible.
+        question_count = len(self.question_bank)
+        k = min(k, question_count)
+        history = self.history(user_id)
+        with self._lock:
+            category_weights = [
+                len(positions) * (WEAKNESS_FLOOR + 1 - (right + 1) / (asked + 2))
+                for positions, asked, right in zip(self.category_positions, history.asked, history.right)
+            ]
+            level = (sum(history.right) + 1) / (sum(history.asked) + 2)
+        cumulative = list(accumulate(category_weights))
+        total = cumulative[-1] if cumulative else 0
+        asked, right = self.asked, self.right
+        picked = set()
+        chosen = []
+        # Unseen questions first, then ones the user got wrong, then anything
+        for eligible in (lambda position: not history.has_seen(position),
+                         lambda position: not history.has_mastered(position),
+                         None):
+            trials = TRIALS_PER_QUESTION * (k - len(chosen))
+            while len(chosen) < k and trials:
+                trials -= 1
+                positions = self.category_positions[min(bisect(cumulative, rng.random() * total), len(cumulative) - 1)]
+                position = positions[int(rng.random() * len(positions))]
+                if position in picked or (eligible is not None and not eligible(position)):
+                    continue
+                ease = (right[position] + 1) / (asked[position] + 2)
+                if rng.random() > 1 - DIFFICULTY_SPREAD * abs(ease - level):
+                    continue
+                picked.add(position)
+                chosen.append(position)
+            if len(chosen) == k:
+                break
+        if len(chosen) < k:
+            # Only reachable when k is close to the bank size
+            remaining = [position for position in range(question_count) if position not in picked]
+            chosen.extend(rng.sample(remaining, k - len(chosen)))
+        return [self.question_bank.questions[position] for position in chosen]
@@ -0,0 +1,64 @@
+# Production entry point; app.run in app.py remains the development server.
+#   python serve.py --mode wsgi   gunicorn with threaded workers serving app:app
+#   python serve.py --mode asgi   uvicorn serving asgi:application
+# Worker counts default to WEB_CONCURRENCY or a value derived from the usable CPUs.
+import argparse
+import os
+
+
+def cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS or Windows
+        return os.cpu_count() or 1
+
+
+def default_workers(mode, cpus):
+    # A threaded WSGI worker blocks while it reads a slow request, so run more of them;
+    # an ASGI worker's event loop keeps waiting clients off its threads
+    if os.environ.get('WEB_CONCURRENCY'):
+        return int(os.environ['WEB_CONCURRENCY'])
+    return 2 * cpus + 1 if mode == 'wsgi' else cpus
+
+
+def serve_wsgi(host, port, workers, threads):
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}')
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('worker_class', 'gthread')
+
+        def load(self):
+            from app import app
+            return app
+
+    Server().run()
+
+
+def serve_asgi(host, port, workers, threads):
+    import uvicorn
+
+    # Read by asgi.py in each worker process
+    os.environ['ASGI_THREADS'] = str(threads)
+    uvicorn.run('asgi:application', host=host, port=port, workers=workers, lifespan='on')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', choices=('wsgi', 'asgi'), default='wsgi')
+    parser.add_argument('--bind', default='0.0.0.0:8000', help='host:port to listen on')
+    parser.add_argument('--workers', type=int, help='worker processes (default: derived from CPU count)')
+    parser.add_argument('--threads', type=int, default=8, help='request threads per worker')
+    args = parser.parse_args()
+
+    host, port = args.bind.rsplit(':', 1)
+    workers = args.workers or default_workers(args.mode, cpu_count())
+    serve = serve_wsgi if args.mode == 'wsgi' else serve_asgi
+    serve(host, int(port), workers, args.threads)
+
+
+if __name__ == '__main__':
+    main()
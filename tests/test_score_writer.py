@@ -0,0 +1,193 @@
+# Crash-safety paths of the write-behind score writer: journal replay, the .flushing
+# handoff, de-duplication of replayed submissions, slot claiming and counting each score once.
+# Run from the project root: python -m pytest tests
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from score_writer import ScoreWriter, claim_journal
+
+
+def record(number, user_id=1):
+    return {'id': f'submission-{number}', 'user_id': user_id, 'score': number, 'category_scores': {}}
+
+
+def write_journal(path, records, torn=False):
+    with open(path, 'w', encoding='utf-8') as f:
+        for item in records:
+            f.write(json.dumps(item) + '\n')
+        if torn:
+            f.write('{"id": "submission-torn", "us')
+
+
+class Recorder:
+    # Flush callback that stores each batch and can be told to fail the first few calls
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+        self.calls = 0
+        self.flushed = threading.Event()
+
+    def __call__(self, records):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError('database unavailable')
+        self.batches.append(list(records))
+        self.flushed.set()
+
+    def records(self):
+        return [item for batch in self.batches for item in batch]
+
+
+def test_replays_journal_left_by_crash_mid_flush(tmp_path):
+    # The crashed worker had moved one batch aside and journaled more after it
+    journal_path = str(tmp_path / 'scores.0.journal')
+    write_journal(journal_path + '.flushing', [record(1), record(2)])
+    write_journal(journal_path, [record(3)], torn=True)
+    flush = Recorder()
+    writer = ScoreWriter(flush, journal_path, flush_interval=0.01)
+    writer.start()
+    writer.close()
+    assert [item['id'] for item in flush.records()] == ['submission-1', 'submission-2', 'submission-3']
+    assert not os.path.exists(journal_path + '.flushing')
+    assert not os.path.exists(journal_path)
+
+
+def test_failed_replay_keeps_journal(tmp_path):
+    journal_path = str(tmp_path / 'scores.0.journal')
+    write_journal(journal_path + '.flushing', [record(1)])
+    writer = ScoreWriter(Recorder(failures=1), journal_path)
+    with pytest.raises(RuntimeError):
+        writer.start()
+    assert os.path.exists(journal_path + '.flushing')
+
+
+def test_retries_failed_flush_without_losing_records(tmp_path):
+    journal_path = str(tmp_path / 'scores.0.journal')
+    errors = []
+    flush = Recorder(failures=2)
+    writer = ScoreWriter(flush, journal_path, flush_interval=0.01, on_error=errors.append)
+    writer.start()
+    for number in range(5):
+        assert writer.submit(record(number))
+    assert flush.flushed.wait(5)
+    writer.close()
+    assert len(errors) == 2
+    assert sorted(item['id'] for item in flush.records()) == [f'submission-{number}' for number in range(5)]
+    assert not os.path.exists(journal_path + '.flushing')
+    assert writer.pending_for(1) == []
+
+
+def test_failed_batch_survives_restart(tmp_path):
+    # A worker shut down while the database is unreachable leaves its batch behind as .flushing
+    journal_path = str(tmp_path / 'scores.0.journal')
+    failing = Recorder(failures=1000)
+    writer = ScoreWriter(failing, journal_path, flush_interval=0.01)
+    writer.start()
+    writer.submit(record(1))
+    writer.submit(record(2))
+    while failing.calls < 2:
+        time.sleep(0.01)
+    assert [item['id'] for item in writer.pending_for(1)] == ['submission-1', 'submission-2']
+    writer.close()
+    assert os.path.exists(journal_path + '.flushing')
+    flush = Recorder()
+    ScoreWriter(flush, journal_path)._replay()
+    assert [item['id'] for item in flush.records()] == ['submission-1', 'submission-2']
+
+
+def test_flushes_at_most_batch_size_records_per_transaction(tmp_path):
+    # A backlog, whether replayed or built up while the database was down, is split into batches
+    journal_path = str(tmp_path / 'scores.0.journal')
+    write_journal(journal_path, [record(number) for number in range(5)])
+    flush = Recorder()
+    writer = ScoreWriter(flush, journal_path, batch_size=2, flush_interval=0.01)
+    writer.start()
+    writer.close()
+    assert [len(batch) for batch in flush.batches] == [2, 2, 1]
+    failing = Recorder(failures=3)
+    writer = ScoreWriter(failing, journal_path, batch_size=2, flush_interval=0.01)
+    writer.start()
+    for number in range(7):
+        writer.submit(record(number))
+    deadline = time.monotonic() + 5
+    while len(failing.records()) < 7 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    writer.close()
+    assert all(len(batch) <= 2 for batch in failing.batches)
+    assert sorted(item['id'] for item in failing.records()) == [f'submission-{number}' for number in range(7)]
+    assert not os.path.exists(journal_path + '.flushing')
+
+
+def test_claims_a_free_journal_slot_per_worker(tmp_path):
+    first_path, first_lock = claim_journal(str(tmp_path))
+    second_path, second_lock = claim_journal(str(tmp_path))
+    assert first_path != second_path
+    # A restarted worker takes over the slot its dead predecessor held
+    first_lock.close()
+    path, lock = claim_journal(str(tmp_path))
+    assert path == first_path
+    lock.close()
+    second_lock.close()
+
+
+@pytest.fixture(scope='module')
+def quiz_app(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp('app')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + str(workdir / 'test.db')
+    import app as quiz_app
+    quiz_app.app.instance_path = str(workdir)
+    with quiz_app.app.app_context():
+        quiz_app.create_missing(quiz_app.db)
+        user = quiz_app.User(username='tester', email='tester@example.com', password_hash='unused')
+        quiz_app.db.session.add(user)
+        quiz_app.db.session.commit()
+    return quiz_app
+
+
+def test_replay_skips_submissions_already_committed(quiz_app, tmp_path):
+    # The batch committed but the worker died before deleting its .flushing file
+    with quiz_app.app.app_context():
+        user_id = quiz_app.User.query.filter_by(email='tester@example.com').one().id
+    committed = [record(1, user_id), record(2, user_id)]
+    quiz_app.flush_scores(committed)
+    journal_path = str(tmp_path / 'scores.0.journal')
+    write_journal(journal_path + '.flushing', committed)
+    write_journal(journal_path, [record(3, user_id), record(3, user_id)])
+    ScoreWriter(quiz_app.flush_scores, journal_path)._replay()
+    with quiz_app.app.app_context():
+        Score = quiz_app.Score
+        assert sorted(quiz_app.db.session.scalars(quiz_app.db.select(Score.submission_id))) == [
+            'submission-1', 'submission-2', 'submission-3']
+        entry = quiz_app.db.session.get(quiz_app.LeaderboardEntry, (quiz_app.OVERALL, user_id))
+        assert (entry.attempts, entry.total_score) == (3, 6)
+
+
+def test_journaled_score_is_counted_once_for_selection(quiz_app):
+    # A write-behind submission reaches the selector when its batch commits, not also when it is journaled
+    app = quiz_app.app
+    app.config['SCORE_WRITE_BEHIND'] = True
+    app.config['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+    try:
+        client = app.test_client()
+        client.post('/register', data={'username': 'writer', 'email': 'writer@example.com', 'password': 'pw'})
+        page = client.get('/quiz').data.decode()
+        answers = dict(re.findall(r'name="(\d+)" value="([^"]*)"', page))
+        assert client.post('/quiz', data=answers).status_code == 302
+        quiz_app.score_writer.close()
+        with app.app_context():
+            user_id = quiz_app.User.query.filter_by(email='writer@example.com').one().id
+        history = quiz_app.selector.history(user_id)
+        assert sum(history.asked) == app.config['QUIZ_LENGTH']
+    finally:
+        app.config['SCORE_WRITE_BEHIND'] = False
+        quiz_app.score_writer = None